@@ -1,29 +1,36 @@
-from dataclasses import dataclass, asdict
-import json
-from urllib.parse import urlparse
+from dataclasses import dataclass, asdict, replace
+from functools import lru_cache
+import orjson
+import re
 import asyncio
+from pydoll.browser.chromium import Chrome
 from pydoll.browser.tab import Tab
 from pydoll.elements.web_element import WebElement
 
-from smart_apply.llm import ask_llm
+from smart_apply.llm_cache import cached_ask_llm
 from smart_apply.page_parsers import (
     extract_emails, 
     extract_forms, 
-    extract_contact_links, 
-    html_to_plain_text, 
+    extract_page_signals, 
+    body_text, 
     infer_company_name, 
-    element_outer_html
+    stripped_form_html
 )
 from smart_apply.result import Err, Ok, safe_call, safe_fn
 from googleapiclient.errors import HttpError
-from smart_apply.gmail import send_email_from_me, gmail_quota_exceeded
+from smart_apply.gmail import send_email_from_me, gmail_quota_exceeded, gmail_quota_exhausted
 from smart_apply.captcha_solvers.recaptcha import *
 from smart_apply.captcha_solvers.cloudflare_challenge import *
 from smart_apply.config import settings
-from smart_apply.browser_utils import script_value, site_available, wait_for_network_idle, wait_until
+from smart_apply.browser_utils import close_tab, script_value, site_available, wait_until
+from pydoll.exceptions import WaitElementTimeout
 from smart_apply.logger import log_debug, log_info, log_error, log_warning, record_sent_email, record_failed_form
 
 
+# Part of the LLM cache key of the form prompts, bump it whenever form_apply_plan or applicant_to_form prompts change
+PROMPT_VERSION = "v2"
+
+
 @dataclass
 class AppliedViaEmail:
     email: str
@@ -57,7 +64,7 @@ type ApplyStatus = (
     SiteUnavailable
 )
 
-@dataclass
+@dataclass(frozen=True)
 class Applicant:
     full_name: str
     email: str
@@ -65,16 +72,46 @@ class Applicant:
     pdf_resume: str
     message: str
 
+@lru_cache(maxsize=256)
+def encode_applicant(applicant: Applicant) -> str:
+    """Applicant as compact JSON, encoded once per site rather than once per LLM prompt."""
+    return orjson.dumps(asdict(applicant)).decode()
+
+def fill_company_name(form_data: dict[str, str], company_name: str) -> dict[str, str]:
+    """Form data mapped from the message template, with the company name put in place of its placeholder."""
+    return {
+        name: value.replace("{company_name}", company_name) if isinstance(value, str) else value
+        for name, value in form_data.items()
+    }
+
 @dataclass
 class ApplyContext:
     tab: Tab
     applicant: Applicant
+    browser: Chrome
+    # The applicant with the message template the LLM maps to forms, so its cached answers are shared by all sites,
+    # the company name is filled into the mapped fields afterwards
+    template: Applicant | None = None
+    company_name: str = ""
+
+@dataclass
+class FormApplyPlan:
+    form: WebElement
+    form_data: dict[str, str]
+
+@dataclass
+class PageLeads:
+    """Ways to apply found on a page, in the tab (ctx) the page is open in."""
+    ctx: ApplyContext
+    url: str
+    job_emails: list[str]
+    contact_emails: list[str]
+    plan: FormApplyPlan | None
 
 
 @safe_fn
 async def apply_on_site(ctx: ApplyContext, start_url: str) -> ApplyStatus:
     tab = ctx.tab
-    host = hostname(start_url)
 
     start_url = ensure_https(start_url)
 
@@ -92,15 +129,16 @@ async def apply_on_site(ctx: ApplyContext, start_url: str) -> ApplyStatus:
     
     await tab.disable_auto_solve_cloudflare_captcha()
 
-    # Extract page links related to jobs and contact info
-    links = await extract_contact_links(tab)
+    # Extract page links related to jobs and contact info, and emails of the start page itself
+    signals = await extract_page_signals(tab)
+    links = signals.job_pages + signals.contact_pages
     
-    if not links:
+    if not links and not signals.job_emails and not signals.contact_emails:
         return NoLinksFound()
 
     # Limit to first 5 links to avoid excessive navigation
     links = links[:5]
-    formatted_links = json.dumps(links, indent=2, ensure_ascii=False)
+    formatted_links = orjson.dumps(links, option=orjson.OPT_INDENT_2).decode()
     log_info(f"Extracted {len(links)} contact links to visit:\n{formatted_links}")
 
     applicant = Applicant(
@@ -114,39 +152,82 @@ async def apply_on_site(ctx: ApplyContext, start_url: str) -> ApplyStatus:
     # Replace message template placeholders with actual values
     company_name = await infer_company_name(tab)
     # Mentioning company name looks more personalized which is good 
-    applicant.message = applicant.message.replace("{company_name}", company_name)
-
+    ctx.template, ctx.company_name = applicant, company_name
+    applicant = replace(applicant, message=applicant.message.replace("{company_name}", company_name))
     ctx.applicant = applicant
-    failed_attempt = False
-    for link in links:  
-        status = await apply_on_page(ctx, link)
-        match status:
-            case AppliedViaEmail() | AppliedViaForm():
-                return status
-            case FailedAttempt():
-                failed_attempt = True
+
+    # Job email on the start page has the highest priority, no need to visit any links
+    if signals.job_emails:
+        if await apply_via_email(ctx, signals.job_emails[0]):
+            return AppliedViaEmail(signals.job_emails[0])
+
+    failed_attempt = bool(signals.job_emails)
+
+    # Links are loaded and analyzed concurrently, the first one in the worker's tab and the rest in their own tabs.
+    # Pages are applied to in link order as soon as each is explored, so a site never gets more than one application,
+    # and once it's applied the pages still being explored are cancelled.
+    link_tabs = [tab]
+    explore_tasks = []
+    try:
+        for _ in links[1:]:
+            link_tabs.append(await ctx.browser.new_tab())
+
+        explore_tasks = [
+            asyncio.create_task(explore_page(replace(ctx, tab=link_tab), link))
+            for link_tab, link in zip(link_tabs, links)
+        ]
+        for link, task in zip(links, explore_tasks):
+            try:
+                page = await task
+            except Exception as e:
+                log_warning(f"Failed to explore {link}: {e}")
+                continue
+
+            status = await apply_on_page(page)
+            match status:
+                case AppliedViaEmail() | AppliedViaForm():
+                    return status
+                case FailedAttempt():
+                    failed_attempt = True
+    finally:
+        for task in explore_tasks:
+            task.cancel()
+        await asyncio.gather(*explore_tasks, return_exceptions=True)
+        for link_tab in link_tabs[1:]:
+            await close_tab(link_tab)
+
+    # Fallback to generic contact email of the start page
+    if signals.contact_emails:
+        if await apply_via_email(ctx, signals.contact_emails[0]):
+            return AppliedViaEmail(signals.contact_emails[0])
+        failed_attempt = True
 
     return FailedAttempt() if failed_attempt else NoApplicationMethod()
 
 
-async def apply_on_page(ctx: ApplyContext, url: str) -> ApplyStatus:
-    '''Try to apply to job on the page by sending email or submitting form'''
-    tab = ctx.tab
+async def explore_page(ctx: ApplyContext, url: str) -> PageLeads:
+    '''Open the page in ctx.tab and find its emails and application form'''
+    await ctx.tab.go_to(url)
+
+    job_emails, contact_emails = await extract_emails(ctx.tab)
+    plan = await form_apply_plan(ctx)
+
+    return PageLeads(ctx, url, job_emails, contact_emails, plan)
 
-    await tab.go_to(url)
 
-    job_emails, contact_emails = await extract_emails(tab)
+async def apply_on_page(page: PageLeads) -> ApplyStatus:
+    '''Try to apply to job on the explored page by sending email or submitting form'''
+    ctx, url = page.ctx, page.url
+    job_emails, contact_emails, plan = page.job_emails, page.contact_emails, page.plan
     
     # Priority 1: apply via job email
     if job_emails:
-        if apply_via_email(ctx, job_emails[0]):
+        if await apply_via_email(ctx, job_emails[0]):
             return AppliedViaEmail(job_emails[0])
 
     # Priority 2: apply via form
-    form = await job_or_contact_form(tab)
-    
-    if form:
-        res = await apply_via_form(ctx, form)      
+    if plan:
+        res = await apply_via_form(ctx, plan)      
         match res:
             case Ok():
                 log_info(f"Applied via form at {url}")
@@ -157,22 +238,16 @@ async def apply_on_page(ctx: ApplyContext, url: str) -> ApplyStatus:
 
     # Priority 3: fallback to generic contact email
     if contact_emails:
-        if apply_via_email(ctx, contact_emails[0]):
+        if await apply_via_email(ctx, contact_emails[0]):
             return AppliedViaEmail(contact_emails[0])
         
-    attempt_failed = job_emails or contact_emails or form
+    attempt_failed = job_emails or contact_emails or plan
     
     return FailedAttempt() if attempt_failed else NoApplicationMethod()
 
 
-async def job_or_contact_form(tab: Tab) -> WebElement | None:
-    html_forms = await extract_forms(tab)
-  
-    task = f"""
-    You are an HTML parsing assistant. Your task is to analyze a provided list of HTML forms and identify the most relevant one based on specific priorities. 
-    
-    The input data provided at the end of this prompt is a list of HTML form elements formattted as: ["<form>...</form>", "<form>...</form>", ...]. Each form in the list is indexed starting from 0.
-
+# Form choice and field mapping rules, shared by form_apply_plan() and applicant_to_form()
+_FORM_PRIORITIES = """
     ### PRIORITIES:
     1.  **Job-Related Form (Highest Priority):** Look for fields or elements clearly indicating a job application. 
 		This includes input fields with names, labels, placeholders, or types related to "CV", "resume", "upload file", "cover letter", "experience", "position", "salary", "references". 
@@ -183,37 +258,115 @@ async def job_or_contact_form(tab: Tab) -> WebElement | None:
 		It should also contain general inquiry fields like "name", "email", or "phone".
     3.  **None:** Ignore forms for login, search, newsletter signup, or unrelated purposes. 
 		If no form meets the criteria for Priority 1 or Priority 2, the result is None.
+    """
 
-    ### INSTRUCTIONS:
-    Examine the HTML structure of each form (including <input>, <label>, <select>, <textarea>, and associated text/attributes) to determine its purpose.
+_QUALIFYING_FORM_PATTERN = re.compile(r'<textarea\b|\btype\s*=\s*["\']?file\b', re.IGNORECASE)
 
+_FIELD_MAPPING_RULES = """
+        Internal Reasoning (Do Not Output):
+        1. Parse Form: List all visible controls with 'name', type, required status (via 'required', *, or cues like "must provide"), and purpose (from name/label/placeholder, e.g., "email" → email field).
+        2. Map Data:
+        - Exact matches first (e.g., applicant "email" → form "email").
+        - Specific Field Handling:
+            • For message/comment/body textareas: Map ONLY 'applicant.message'. Do NOT prepend or include 'applicant.subject' in this field unless the form specifically labels the field as "Subject and Message".
+            • If a distinct "Subject" field exists in the form, map 'applicant.subject' there. Otherwise, drop the subject.
+        - Name Variations: Concatenate/combine ONLY for name fields (e.g., first+last -> "full_name": "John Doe").
+        - Required/no match:
+            • Try to derive from available applicant data (e.g., use experience summary as a cover-letter-style text).
+            • If derivation is impossible, use type-appropriate safe placeholders:
+              • phone fields → structurally valid fallback such as "+0000000000")
+              • postal/zip → "00000"
+              • dates → "1970-01-01" or nearest valid default
+            • Do not use "N/A" for any field that is commonly validated (phone, email, postal code, URLs, dates).
+            • For fields that are required but do not commonly require strict format
+            (e.g., generic text fields): use "N/A".
+            • Never leave a required field empty.
+        - Optional/no mapping: Skip entirely.
+        - Edge cases: <select> → best 'value' option; checkboxes → "on" if checked;.
+        """
+
+# Template for applicant_to_form(), filled with format_map so literal braces are doubled
+_APPLICANT_TO_FORM_PROMPT = """
+        You are an expert form-filling assistant. Map applicant data to a job/contact form from the provided HTML snippet, outputting a JSON object like {{ "input_name1": "value1", ... }}, using exact 'name' attributes as keys and suitable string values.
+
+        Inputs (given at the end):
+        - Form HTML Snippet (<form_html>): Partial <form> fragment. Parse for visible <input>, <select>, <textarea> (and labels/placeholders for context). Ignore hidden/CAPTCHA/non-interactive elements (e.g., type="hidden", display:none, aria-hidden) and ignore any non-fillable controls such as <button>, submit/reset buttons, and other elements that users do not type or select values into.
+        - Applicant Data (<applicant>): JSON with fields like name, email, phone, resume URL, etc. Use only this data—no inventions.
+        """ + _FIELD_MAPPING_RULES + """
+        Output: Valid JSON only—no text. Empty {{}} if no mappable fields or parse fails. Keys as-is (e.g., "full_name"). Escape JSON specials.
+
+        <form_html>
+        {form_html}
+        </form_html>
+        <applicant>
+        {applicant}
+        </applicant>
+        """
+
+
+async def form_apply_plan(ctx: ApplyContext) -> FormApplyPlan | None:
+    '''Pick the job or contact form of the page and map applicant data to its fields in a single LLM call'''
+    forms = await extract_forms(ctx.tab)
+    # Forms without a message box or file upload can't qualify by _FORM_PRIORITIES, the LLM never sees them
+    html_forms = [html if _QUALIFYING_FORM_PATTERN.search(html) else '' for html, _ in forms]
+    if not any(html_forms): return None
+
+    applicant_json = encode_applicant(ctx.template or ctx.applicant)
+  
+    task = f"""
+    You are an HTML parsing and form-filling assistant. Your task is to do both A and B below.
+
+    A. Analyze a provided list of HTML forms and identify the most relevant one based on specific priorities. 
+    The forms are formattted as: ["<form>...</form>", "<form>...</form>", ...]. Each form in the list is indexed starting from 0.
+    Empty strings are placeholders for irrelevant forms, never select them.
+    Examine the HTML structure of each form (including <input>, <label>, <select>, <textarea>, and associated text/attributes) to determine its purpose.
+    {_FORM_PRIORITIES}
+    B. Map applicant data to the selected form, using exact 'name' attributes as keys and suitable string values.
+        Parse the selected form for visible <input>, <select>, <textarea> (and labels/placeholders for context). Ignore hidden/CAPTCHA/non-interactive elements (e.g., type="hidden", display:none, aria-hidden) and ignore any non-fillable controls such as <button>, submit/reset buttons, and other elements that users do not type or select values into.
+        Use only the applicant data (JSON with fields like name, email, phone, resume URL, etc.)—no inventions.
+    {_FIELD_MAPPING_RULES}
     ### OUTPUT FORMAT:
-    Respond with strictly a single integer (the 0-based index of the selected form) or the word "None". 
-    Do not include any explanations, reasoning, markdown, or additional text.
+    Respond with strictly valid JSON only (no explanations, reasoning, markdown, or additional text):
+    {{"form_index": 0, "fields": {{"input_name1": "value1", ...}}}}
+    Use null for "form_index" and {{}} for "fields" if no form meets the criteria. Escape JSON specials.
 
     ### DATA:
     <forms>
     {html_forms}
     </forms>
+    <applicant>
+    {applicant_json}
+    </applicant>
     """
     
-    res = ask_llm(task, "smart")
+    res = await cached_ask_llm(task, "smart", ["form_apply_plan", PROMPT_VERSION, *html_forms, applicant_json])
+    try:
+        plan = orjson.loads(res)
+    except orjson.JSONDecodeError:
+        plan = None
+    # Valid JSON may still be a list or a bare value instead of the plan object
+    if not isinstance(plan, dict):
+        log_warning(f"LLM returned invalid form plan: {res[:200]}")
+        return None
+
+    idx = plan.get('form_index')
+    if not isinstance(idx, int) or not 0 <= idx < len(forms) or not html_forms[idx]:
+        return None
 
-    if res.isdigit():
-        forms = await tab.query('form', find_all=True, raise_exc=False) or []
-        idx = int(res)
-        if idx < len(forms):
-            return forms[idx]
-    return None
+    fields = plan.get('fields')
+    fields = fill_company_name(fields, ctx.company_name) if isinstance(fields, dict) else {}
+    return FormApplyPlan(forms[idx][1], fields)
 
 
 @safe_fn
-async def apply_via_form(ctx: ApplyContext, form: WebElement):
+async def apply_via_form(ctx: ApplyContext, plan: FormApplyPlan):
     tab = ctx.tab
+    form = plan.form
     
     # TODO: expose required fields by submitting empty form
     
-    form_data = await applicant_to_form(ctx.applicant, form)
+    # The plan usually maps the fields already, map them separately only when it didn't
+    form_data = plan.form_data or fill_company_name(await applicant_to_form(ctx.template or ctx.applicant, form), ctx.company_name)
     
     # TODO: uncheck checkboxes to avoid unwanted subscriptions
     
@@ -235,48 +388,15 @@ async def apply_via_form(ctx: ApplyContext, form: WebElement):
     
 async def applicant_to_form(applicant: Applicant, form: WebElement) -> dict[str, str]:
     """Maps applicant data to form fields based on form HTML snippet."""
-    form_html = await element_outer_html(form)
-
-    applicant_to_form_prompt = """
-        You are an expert form-filling assistant. Map applicant data to a job/contact form from the provided HTML snippet, outputting a JSON object like { "input_name1": "value1", ... }, using exact 'name' attributes as keys and suitable string values.
-
-        Inputs:
-        - Form HTML Snippet ({form_html}): Partial <form> fragment. Parse for visible <input>, <select>, <textarea> (and labels/placeholders for context). Ignore hidden/CAPTCHA/non-interactive elements (e.g., type="hidden", display:none, aria-hidden) and ignore any non-fillable controls such as <button>, submit/reset buttons, and other elements that users do not type or select values into.
-        - Applicant Data ({applicant}): JSON with fields like name, email, phone, resume URL, etc. Use only this data—no inventions.
-
-        Internal Reasoning (Do Not Output):
-        1. Parse Form: List all visible controls with 'name', type, required status (via 'required', *, or cues like "must provide"), and purpose (from name/label/placeholder, e.g., "email" → email field).
-        2. Map Data:
-        - Exact matches first (e.g., applicant "email" → form "email").
-        - Specific Field Handling:
-            • For message/comment/body textareas: Map ONLY 'applicant.message'. Do NOT prepend or include 'applicant.subject' in this field unless the form specifically labels the field as "Subject and Message".
-            • If a distinct "Subject" field exists in the form, map 'applicant.subject' there. Otherwise, drop the subject.
-        - Name Variations: Concatenate/combine ONLY for name fields (e.g., first+last -> "full_name": "John Doe").
-        - Required/no match:
-            • Try to derive from available applicant data (e.g., use experience summary as a cover-letter-style text).
-            • If derivation is impossible, use type-appropriate safe placeholders:
-              • phone fields → structurally valid fallback such as "+0000000000")
-              • postal/zip → "00000"
-              • dates → "1970-01-01" or nearest valid default
-            • Do not use "N/A" for any field that is commonly validated (phone, email, postal code, URLs, dates).
-            • For fields that are required but do not commonly require strict format
-            (e.g., generic text fields): use "N/A".
-            • Never leave a required field empty.
-        - Optional/no mapping: Skip entirely.
-        - Edge cases: <select> → best 'value' option; checkboxes → "on" if checked;.
+    form_html = await stripped_form_html(form)
 
-        Output: Valid JSON only—no text. Empty {} if no mappable fields or parse fails. Keys as-is (e.g., "full_name"). Escape JSON specials.
-        """
-    
-    applicant_json = json.dumps(asdict(applicant), ensure_ascii=False)
-                              
-    applicant_to_form_prompt = (applicant_to_form_prompt
-        .replace("{form_html}", form_html)
-        .replace("{applicant}", applicant_json))
+    applicant_json = encode_applicant(applicant)
+    applicant_to_form_prompt = _APPLICANT_TO_FORM_PROMPT.format_map({"form_html": form_html, "applicant": applicant_json})
 
     # we will use more advanced smart since fast failed to detect required fields
-    res = ask_llm(applicant_to_form_prompt, model="smart")
-    form_data = json.loads(res)
+    res = await cached_ask_llm(
+        applicant_to_form_prompt, "smart", ["applicant_to_form", PROMPT_VERSION, form_html, applicant_json])
+    form_data = orjson.loads(res)
     
     if not form_data: raise ValueError("Failed to map applicant data to form fields")
     
@@ -286,18 +406,21 @@ async def applicant_to_form(applicant: Applicant, form: WebElement) -> dict[str,
 async def fill_form(form: WebElement, form_data: dict[str, str]):
     """ Fills a specific form on the page with given form_data.  """
 
+    # Inspect all fields in one script call, element handles are only queried for the actual actions
+    fields = await form_fields(form, list(form_data))
+    missing = [name for name in form_data if not fields.get(name)]
+    if missing:
+        raise ValueError(f"No element found for name='{missing[0]}' in the form.")
+
     for name, value in form_data.items():
+        field = fields[name]
+        tag = field['tag']
         input_element = await form.query(f'[name="{name}"]', raise_exc=False)
-
-        if not input_element:
-            raise ValueError(f"No element found for name='{name}' in the form.")
-
-        tag = (input_element.tag_name or '').lower()
         
         await input_element.scroll_into_view()  # Ensure the element is in view before interacting
 
         if tag == "input":
-            input_type = input_element.get_attribute('type') or 'text'
+            input_type = field['type'] or 'text'
             if input_type in ("checkbox", "radio"):
                 # For radios and checkbox groups, select the specific option by value
                 specific = await form.query(f'[name="{name}"][value="{value}"]', raise_exc=False)
@@ -310,9 +433,7 @@ async def fill_form(form: WebElement, form_data: dict[str, str]):
                 elif input_type == "checkbox":
                     # Handle boolean toggles (allows unchecking!)
                     should_check = str(value).lower() in ["true", "1", "yes", "on"]
-                    result = await input_element.execute_script("return this.checked", return_by_value=True)
-                    currently_checked = script_value(result)
-                    if bool(currently_checked) != should_check:
+                    if field['checked'] != should_check:
                         await input_element.execute_script("this.click()")
                 else:
                     # Raise error for radios so you don't accidentally select the wrong one
@@ -336,7 +457,35 @@ async def fill_form(form: WebElement, form_data: dict[str, str]):
             )
         else:
             raise ValueError(f"Unsupported element <{tag}> for name='{name}'")
-    
+
+
+async def form_fields(form: WebElement, names: list[str]) -> dict[str, dict | None]:
+    """Tag, type and checked state of the first form element with each name, None for names not in the form."""
+    result = await form.execute_script(
+        f"const names = {orjson.dumps(names).decode()};"
+        "return Object.fromEntries(names.map(n => {"
+        "  const el = this.querySelector(`[name=\"${CSS.escape(n)}\"]`);"
+        "  return [n, el && {tag: el.tagName.toLowerCase(), type: el.type || '', checked: !!el.checked}];"
+        "}))",
+        return_by_value=True
+    )
+    return script_value(result) or {}
+
+
+# Longest time a submitted form gets to show that the submission went through
+SUBMIT_TIMEOUT = 10
+
+# Page text markers of a successful or rejected submission
+_SUBMIT_SUCCESS_PATTERN = re.compile(
+    r'\b(thank you|thanks for|submission (?:successful|received)|successfully (?:sent|submitted)'
+    r'|we (?:have )?(?:received|got) your|message (?:has been )?sent)\b',
+    re.IGNORECASE
+)
+_SUBMIT_FAILURE_PATTERN = re.compile(
+    r'\b(error|required|invalid|please (?:correct|fix|fill|enter)|failed)\b', re.IGNORECASE
+)
+
+
 @safe_fn
 async def submit_form(tab: Tab, form: WebElement):
     # Find submit button
@@ -349,46 +498,69 @@ async def submit_form(tab: Tab, form: WebElement):
     if not submit_btn:
         raise ValueError("No submit button found in form.")
 
-    # Click submit and wait for potential form submission response
+    # Markers already on the page before submitting don't count
+    baseline = submit_markers(await body_text(tab))
+
+    # Click submit and poll for a success sign, instead of always sleeping the whole timeout
     await submit_btn.click()
-    await asyncio.sleep(10)
-
-    # Assume successful form submission hides the form, including redirects to thank you pages
-    await form.scroll_into_view()  # Ensure the form is in view to get accurate visibility status
-    if not await form.is_visible():
-        log_debug("Form submission appears successful (form is no longer visible).")
-        return
-
-    # Also assume successful submission when input fields are cleared
-    inputs = await form.query(
-        'input[type="text"], input[type="email"]', find_all=True, raise_exc=False
-    ) or []
-    
-    all_cleared = True
-    for inp in inputs:
-        result = await inp.execute_script("return this.value", return_by_value=True)
-        if script_value(result):
-            all_cleared = False
-            break
-
-    if all_cleared and inputs:
+    try:
+        await wait_until(lambda: form_submitted(tab, form, baseline), timeout=SUBMIT_TIMEOUT, interval=0.5)
+    except WaitElementTimeout:
+        return Err('form is still visible and input fields not cleared after submission, cannot confirm success')
+
+
+def submit_markers(text: str) -> tuple[int, int]:
+    """Number of success and failure markers in the page text."""
+    return len(_SUBMIT_SUCCESS_PATTERN.findall(text)), len(_SUBMIT_FAILURE_PATTERN.findall(text))
+
+
+async def form_submitted(tab: Tab, form: WebElement, baseline: tuple[int, int]) -> bool:
+    try:
+        # Cheapest sign first: a new confirmation message and no new error messages
+        successes, failures = submit_markers(await body_text(tab))
+        if successes > baseline[0] and failures <= baseline[1]:
+            log_debug("Form submission appears successful (confirmation text appeared).")
+            return True
+
+        # Assume successful form submission hides the form, including redirects to thank you pages
+        await form.scroll_into_view()  # Ensure the form is in view to get accurate visibility status
+        if not await form.is_visible():
+            log_debug("Form submission appears successful (form is no longer visible).")
+            return True
+
+        # Also assume successful submission when input fields are cleared, checked in one round trip
+        result = await form.execute_script(
+            "const inputs = [...this.querySelectorAll('input[type=\"text\"], input[type=\"email\"]')];"
+            "return inputs.length > 0 && inputs.every(input => !input.value)",
+            return_by_value=True
+        )
+    # The page may be in the middle of navigating, just check again on the next poll
+    except Exception:
+        return False
+
+    if script_value(result):
         log_debug("Form submission appears successful (input fields cleared).")
-        return
+        return True
+    return False
 
-    return Err('form is still visible and input fields not cleared after submission, cannot confirm success')
 
+async def apply_via_email(ctx: ApplyContext, email_to: str) -> bool:
+    """Send application email. Returns True on success, False on failure.
+    Hitting the Gmail rate limit (after retries) is not fatal either, so the site can still be applied via form,
+    and no more emails are sent for the rest of the run."""
+    if gmail_quota_exhausted():
+        log_debug(f"Gmail quota is exhausted, not sending email to {email_to}")
+        return False
 
-def apply_via_email(ctx: ApplyContext, email_to: str) -> bool:
-    """Send application email. Returns True on success, False on non-fatal failure.
-    Re-raises HttpError when Gmail rate limit is hit so the program can exit."""
     app = ctx.applicant
     try:
-        send_email_from_me(email_to, app.subject, app.message, [app.pdf_resume])
+        await send_email_from_me(email_to, app.subject, app.message, [app.pdf_resume])
     except HttpError as e:
-        if gmail_quota_exceeded(e):
-            raise
         error_msg = e._get_reason() if hasattr(e, '_get_reason') else str(e)
-        log_error(f"Failed to send email to {email_to}: {error_msg}")
+        if gmail_quota_exceeded(e):
+            log_error(f"Gmail API rate limit reached, failed to send email to {email_to}: {error_msg}")
+        else:
+            log_error(f"Failed to send email to {email_to}: {error_msg}")
         return False
     
     
@@ -399,9 +571,28 @@ def apply_via_email(ctx: ApplyContext, email_to: str) -> bool:
 
 
 # Url utilities
+@lru_cache(maxsize=4096)
 def hostname(url: str) -> str | None:
-    return urlparse(url.strip() if '://' in url else f'https://{url.strip()}').hostname
+    """Host of the URL, lowercased and without userinfo or port, like urlparse().hostname.
+    Found by slicing the authority out with str.find, no full URL parse."""
+    url = url.strip()
+    scheme_end = url.find('://')
+    start = scheme_end + 3 if scheme_end > 0 and url[:scheme_end].isalnum() else 0
+
+    end = len(url)
+    for separator in '/?#':
+        i = url.find(separator, start, end)
+        if i >= 0:
+            end = i
+
+    host = url[start:end].rpartition('@')[2]
+    if host.startswith('['):
+        host = host[1:host.find(']')]
+    else:
+        host = host.partition(':')[0]
+    return host.lower() or None
 
 
 def ensure_https(url: str) -> str:
-    return url if url.startswith(('http://', 'https://')) else f'https://{hostname(url)}'
\ No newline at end of file
+    url = url.strip()
+    return url if url.startswith(('http://', 'https://')) else f'https://{url}'
\ No newline at end of file
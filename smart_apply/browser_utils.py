@@ -1,8 +1,8 @@
-import time
 from collections.abc import Callable
 import asyncio
 import inspect
 
+import orjson
 from pydoll.browser.tab import Tab
 from pydoll.exceptions import WaitElementTimeout
 from smart_apply.logger import log_info, log_warning
@@ -14,46 +14,86 @@ def script_value(response: dict):
 
 
 async def wait_for_network_idle(tab: Tab, timeout=30, idle_time=1):
-    """Wait until no network activity occurs for `idle_time` seconds."""
-    start_time = time.time()
-    last_activity_time = time.time()
+    """Wait until no request has been in flight for `idle_time` seconds."""
+    loop = asyncio.get_running_loop()
+    idle = asyncio.Event()
+    in_flight: set[str] = set()
+    idle_timer: asyncio.TimerHandle | None = None
+
+    # Idle is declared by a timer armed whenever the last pending request settles, no polling
+    def arm_idle_timer():
+        nonlocal idle_timer
+        if idle_timer:
+            idle_timer.cancel()
+        idle_timer = loop.call_later(idle_time, idle.set)
+
+    def on_request_sent(event):
+        # Redirects reuse the request id, so a set keeps them from being counted twice
+        in_flight.add(event['params']['requestId'])
+        if idle_timer:
+            idle_timer.cancel()
+
+    def on_request_settled(event):
+        in_flight.discard(event['params']['requestId'])
+        if not in_flight:
+            arm_idle_timer()
 
     network_was_enabled = tab.network_events_enabled
     if not network_was_enabled:
         await tab.enable_network_events()
 
-    def on_request_finished(event):
-        nonlocal last_activity_time
-        last_activity_time = time.time()
-
-    cb_id = await tab.on("Network.loadingFinished", on_request_finished)
-
+    cb_ids = [
+        await tab.on("Network.requestWillBeSent", on_request_sent),
+        await tab.on("Network.loadingFinished", on_request_settled),
+        await tab.on("Network.loadingFailed", on_request_settled),
+    ]
+    arm_idle_timer()
+
+    try:
+        async with asyncio.timeout(timeout):
+            await idle.wait()
+        log_info("Network is idle.")
+    except TimeoutError:
+        log_warning("Timeout reached while waiting for network to be idle.")
+    finally:
+        idle_timer.cancel()
+        for cb_id in cb_ids:
+            await tab.remove_callback(cb_id)
+        if not network_was_enabled:
+            await tab.disable_network_events()
+
+
+async def wait_until(condition: Callable[[], bool], timeout=30, interval=0.2):
+    """Poll condition until it is truthy, starting at 10 ms and backing off to `interval` between checks,
+    so conditions met right away return fast and slow ones aren't checked needlessly often."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.01
+    # The deadline is only checked between polls, a slow condition is never cancelled midway
+    # and its own errors, TimeoutError included, reach the caller as they are
     while True:
-        await asyncio.sleep(1)
-        now = time.time()
-        if now - start_time > timeout:
-            log_warning("Timeout reached while waiting for network to be idle.")
-            break
-        if now - last_activity_time >= idle_time:
-            log_info("Network is idle.")
-            break
-
-    await tab.remove_callback(cb_id)
-    if not network_was_enabled:
-        await tab.disable_network_events()
-
-
-async def wait_until(condition: Callable[[], bool], timeout=30, interval=0.1):
-    deadline = time.time() + timeout
-    while time.time() < deadline:
         result = condition()
         if inspect.isawaitable(result):
             result = await result
 
         if result:
             return
-        await asyncio.sleep(interval)
-    raise WaitElementTimeout("wait_until() timeout")
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise WaitElementTimeout("wait_until() timeout")
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, interval)
+
+
+# Texts of Chrome's own error pages
+_SITE_ERROR_SIGNALS = [
+    "ERR_NAME_NOT_RESOLVED",
+    "ERR_CONNECTION_REFUSED",
+    "ERR_CONNECTION_TIMED_OUT",
+    "ERR_INTERNET_DISCONNECTED",
+    "This site can't be reached",
+    "DNS_PROBE_FINISHED_NXDOMAIN",
+]
 
 
 async def site_available(tab: Tab) -> bool:
@@ -61,14 +101,19 @@ async def site_available(tab: Tab) -> bool:
     if current_url.startswith("chrome-error://"):
         return False
 
-    content = await tab.page_source
-    error_signals = [
-        "ERR_NAME_NOT_RESOLVED",
-        "ERR_CONNECTION_REFUSED",
-        "ERR_CONNECTION_TIMED_OUT",
-        "ERR_INTERNET_DISCONNECTED",
-        "This site can't be reached",
-        "DNS_PROBE_FINISHED_NXDOMAIN",
-    ]
-    
-    return not any(signal in content for signal in error_signals)
\ No newline at end of file
+    # Searched in the page itself, only a boolean crosses the CDP socket instead of the whole page source
+    result = await tab.execute_script(
+        f"const signals = {orjson.dumps(_SITE_ERROR_SIGNALS).decode()};"
+        "const html = document.documentElement.outerHTML;"
+        "return signals.some(signal => html.includes(signal))",
+        return_by_value=True
+    )
+    return not script_value(result)
+
+
+async def close_tab(tab: Tab):
+    """Close a tab. A tab that crashed may fail to close, that must not stop the caller."""
+    try:
+        await tab.close()
+    except Exception as e:
+        log_warning(f"Failed to close tab: {e}")
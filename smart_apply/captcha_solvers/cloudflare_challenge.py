@@ -1,6 +1,5 @@
 from pydoll.browser.tab import Tab
-from pydoll.elements.web_element import WebElement
-from smart_apply.browser_utils import wait_until
+from smart_apply.browser_utils import script_value, wait_until
 from smart_apply.logger import log_info
 
 async def wait_until_cloudflare_resolved(tab: Tab):
@@ -16,23 +15,17 @@ async def wait_until_cloudflare_resolved(tab: Tab):
 
 
 async def cf_challenge(tab: Tab) -> bool:
-    # Interstitial challenge indicator
-    title = await tab.title
-    if title == "Just a moment...": 
-        return True
-
-    # Turnstile indicator
-    turnstile = await tab.find(class_name='cf-turnstile', raise_exc=False)
-
-    if not turnstile:
-        return False  # No challenge detected
-    
-    hidden: WebElement = await tab.find(name='cf-turnstile-response', raise_exc=False)
-    
-    if hidden and hidden.value:
-        return False  # Challenge solved, hidden input has value
-    
-    return True  # Challenge detected and not solved
+    # All indicators are checked in one script call, since it is polled until the challenge is solved
+    result = await tab.execute_script(
+        # Interstitial challenge indicator
+        "if (document.title === 'Just a moment...') return true;"
+        # Turnstile indicator, solved once its hidden response input has a value
+        "if (!document.querySelector('.cf-turnstile')) return false;"
+        "const hidden = document.querySelector('[name=\"cf-turnstile-response\"]');"
+        "return !(hidden && hidden.value);",
+        return_by_value=True
+    )
+    return bool(script_value(result))
 
 
 async def no_cf_challenge(tab: Tab) -> bool:
@@ -1,23 +1,39 @@
 import asyncio
-import os
-from random import randrange
+import tempfile
+import threading
 from typing import Literal
 from pydoll.browser.tab import Tab
 from pydoll.elements.web_element import WebElement
 from pydoll.exceptions import WaitElementTimeout, ElementNotFound
+import aiohttp
+import orjson
 import pydub
 import speech_recognition
-import urllib
 from smart_apply.browser_utils import script_value
-from smart_apply.logger import log_info
+from smart_apply.config import settings
+from smart_apply.logger import log_info, log_warning
 from smart_apply.result import Err, Ok, Result, safe_fn
 
 
+# reCAPTCHA v2 widget selectors
+CHECKBOX_IFRAME_SELECTOR = 'iframe[title="reCAPTCHA"]'
+CHALLENGE_IFRAME_SELECTOR = 'iframe[title*="recaptcha challenge"]'
+CHECKMARK_SELECTOR = '.recaptcha-checkbox-checkmark'
+
+
+RECAPTCHA_MARKERS = ['grecaptcha', 'recaptcha/api.js', 'recaptcha__', 'g-recaptcha']
+
+
 async def page_has_recaptcha(tab: Tab) -> bool:
-    """Detect if ReCaptcha is present on the page."""
-    markers = ['grecaptcha', 'recaptcha/api.js', 'recaptcha__', 'g-recaptcha']
-    content = await tab.page_source
-    return any(m in content for m in markers)
+    """Detect if ReCaptcha is present on the page.
+    The markers are searched in the page itself, only a boolean comes back instead of the whole page source."""
+    result = await tab.execute_script(
+        f"const markers = {orjson.dumps(RECAPTCHA_MARKERS).decode()};"
+        "const html = document.documentElement.outerHTML;"
+        "return markers.some(marker => html.includes(marker))",
+        return_by_value=True
+    )
+    return bool(script_value(result))
 
 
 async def find_recaptcha(container: WebElement) -> WebElement | None:
@@ -35,7 +51,7 @@ async def find_recaptcha(container: WebElement) -> WebElement | None:
         await iframe.wait_until(is_visible=True, timeout=15)
 
          # Check if it's visible v2 recaptcha with checkbox (not invisible or v3)
-        await iframe.query('.recaptcha-checkbox-checkmark')
+        await iframe.query(CHECKMARK_SELECTOR)
 
         return iframe
     except (WaitElementTimeout, ElementNotFound):
@@ -60,9 +76,11 @@ async def solve_recaptcha_if_present(container: WebElement, tab: Tab) -> Result[
 
 
 # Constants
-TEMP_DIR = os.getenv("TEMP") if os.name == "nt" else "/tmp"
 TIMEOUT_STANDARD = 7
 
+# Shared across solves so audio downloads reuse kept-alive connections to Google, see audio_session()
+_audio_session: aiohttp.ClientSession | None = None
+
 
 async def solve_recaptcha(tab: Tab) -> None:
     """Attempt to solve the reCAPTCHA challenge via checkbox click,
@@ -73,15 +91,16 @@ async def solve_recaptcha(tab: Tab) -> None:
     """
     # HACK: Pydoll has issues with recaptcha iframe(or iframes at all) and wrongly clicks on its elements inside
     # https://github.com/autoscrape-labs/pydoll/issues/370
-    # every time we use the iframe element, we need to re-query it to get a fresh reference that works correctly
+    # an iframe reference goes stale once its content changes (e.g. after a click inside it),
+    # so we re-query the iframe after every click and reuse the fresh reference until the next one
     async def checkbox_iframe():
         return await tab.query(
-            'iframe[title="reCAPTCHA"]', timeout=TIMEOUT_STANDARD
+            CHECKBOX_IFRAME_SELECTOR, timeout=TIMEOUT_STANDARD
         )
     
     async def challenge_iframe():
         return await tab.query(
-            'iframe[title*="recaptcha challenge"]', timeout=TIMEOUT_STANDARD
+            CHALLENGE_IFRAME_SELECTOR, timeout=TIMEOUT_STANDARD
         )
     
     # Find and click the reCAPTCHA checkbox iframe
@@ -92,17 +111,19 @@ async def solve_recaptcha(tab: Tab) -> None:
         return
 
     # Handle audio challenge
-    bounds = await (await challenge_iframe()).bounds
-    audio_btn = await (await challenge_iframe()).query(
+    challenge = await challenge_iframe()
+    bounds = await challenge.bounds
+    audio_btn = await challenge.query(
         '#recaptcha-audio-button', timeout=TIMEOUT_STANDARD
     )
     await audio_btn.click(x_offset=bounds[0], y_offset=bounds[1])
 
-    if await recaptcha_detected_bot(tab):
+    challenge = await challenge_iframe()
+    if await recaptcha_detected_bot(tab, challenge):
         raise RuntimeError('ReCaptcha detected bot behavior')
 
     # Download and process audio
-    audio_source = await (await challenge_iframe()).query(
+    audio_source = await challenge.query(
         '#audio-source', timeout=TIMEOUT_STANDARD
     )
     src_result = await audio_source.execute_script(
@@ -110,16 +131,20 @@ async def solve_recaptcha(tab: Tab) -> None:
     )
     src = script_value(src_result)
 
+    # Start the download right away and resolve the elements we need afterwards while it is in flight
+    download = asyncio.create_task(audio_bytes(src))
     try:
-        text_response = await asyncio.to_thread(recognize_text_from_audio, src)
+        response_input, verify_btn, bounds = await asyncio.gather(
+            challenge.query('#audio-response'),
+            challenge.query('#recaptcha-verify-button'),
+            challenge.bounds,
+        )
+        text_response = await asyncio.to_thread(recognize_text_from_audio, await download)
 
         # Insert the recognized text
-        response_input = await (await challenge_iframe()).query('#audio-response')
         await response_input.insert_text(text_response.lower())
 
         # Click the verify button
-        bounds = await (await challenge_iframe()).bounds
-        verify_btn = await (await challenge_iframe()).query('#recaptcha-verify-button')
         await verify_btn.click(x_offset=bounds[0], y_offset=bounds[1])
 
         if not await recaptcha_solved(tab):
@@ -131,47 +156,99 @@ async def solve_recaptcha(tab: Tab) -> None:
         raise
     except Exception as e:
         raise RuntimeError(f'Audio challenge failed: {e}') from e
+    finally:
+        # Also reap a download that already failed, so its exception isn't reported as never retrieved
+        download.cancel()
+        await asyncio.gather(download, return_exceptions=True)
+
+
+def audio_session() -> aiohttp.ClientSession:
+    """Lazily create the HTTP session used to download audio challenges."""
+    global _audio_session
+    if _audio_session is None or _audio_session.closed:
+        _audio_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=30)
+        )
+    return _audio_session
+
+
+async def close_audio_session() -> None:
+    """Close the audio download session, call once on shutdown."""
+    if _audio_session and not _audio_session.closed:
+        await _audio_session.close()
 
 
-def recognize_text_from_audio(audio_url: str) -> str:
-    """Download the audio challenge, convert to WAV, and return recognized text.
+async def audio_bytes(audio_url: str) -> bytes:
+    """Download the audio challenge (mp3)."""
+    async with audio_session().get(audio_url, raise_for_status=True) as response:
+        return await response.read()
+
+
+def recognize_text_from_audio(mp3: bytes) -> str:
+    """Convert the downloaded audio challenge to WAV and return recognized text.
 
     This is intentionally synchronous (file I/O + speech recognition).
     Call via ``asyncio.to_thread`` to avoid blocking the event loop.
     """
-    mp3_path = os.path.join(TEMP_DIR, f'{randrange(1, 1000)}.mp3')
-    wav_path = os.path.join(TEMP_DIR, f'{randrange(1, 1000)}.wav')
+    # Files are removed on context exit, delete_on_close=False lets ffmpeg reopen them by name (Windows)
+    with (
+        tempfile.NamedTemporaryFile(suffix='.mp3', delete_on_close=False) as mp3_file,
+        tempfile.NamedTemporaryFile(suffix='.wav', delete_on_close=False) as wav_file,
+    ):
+        mp3_file.write(mp3)
+        mp3_file.close()
+        wav_file.close()
 
-    try:
-        urllib.request.urlretrieve(audio_url, mp3_path)
-        sound = pydub.AudioSegment.from_mp3(mp3_path)
-        sound.export(wav_path, format='wav')
+        if settings.recaptcha_speech_backend == 'whisper' and whisper_model():
+            return whisper_transcript(mp3_file.name)
+
+        sound = pydub.AudioSegment.from_mp3(mp3_file.name)
+        sound.export(wav_file.name, format='wav')
 
         recognizer = speech_recognition.Recognizer()
-        with speech_recognition.AudioFile(wav_path) as source:
+        with speech_recognition.AudioFile(wav_file.name) as source:
             audio = recognizer.record(source)
 
         return recognizer.recognize_google(audio)
 
-    finally:
-        for path in (mp3_path, wav_path):
-            if os.path.exists(path):
-                try:
-                    os.remove(path)
-                except OSError:
-                    pass
+
+# The Whisper model once loaded, False when faster-whisper is not installed
+_whisper = None
+# recognize_text_from_audio() runs in several worker threads, only one of them may load the model
+_whisper_lock = threading.Lock()
+
+
+def whisper_model():
+    """Load the local Whisper model once (optional `faster-whisper` dependency), None when it is not installed."""
+    global _whisper
+    with _whisper_lock:
+        if _whisper is None:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                log_warning("faster-whisper is not installed, falling back to Google speech recognition.")
+                _whisper = False
+            else:
+                _whisper = WhisperModel(settings.recaptcha_whisper_model, device='cpu', compute_type='int8')
+    return _whisper or None
+
+
+def whisper_transcript(audio_path: str) -> str:
+    """Recognize speech locally with Whisper, no network round-trip to Google."""
+    segments, _ = whisper_model().transcribe(audio_path, language='en')
+    return ' '.join(segment.text.strip() for segment in segments)
 
 
 async def recaptcha_solved(tab: Tab) -> bool:
     """Check if the reCAPTCHA has been solved successfully."""
     try:
         checkbox_iframe = await tab.query(
-            'iframe[title="reCAPTCHA"]', raise_exc=False
+            CHECKBOX_IFRAME_SELECTOR, raise_exc=False
         )
         if not checkbox_iframe:
             return False
         checkmark = await checkbox_iframe.query(
-            '.recaptcha-checkbox-checkmark', raise_exc=False
+            CHECKMARK_SELECTOR, raise_exc=False
         )
         if not checkmark:
             return False
@@ -183,11 +260,14 @@ async def recaptcha_solved(tab: Tab) -> bool:
         return False
 
 
-async def recaptcha_detected_bot(tab: Tab) -> bool:
-    """Check if the bot has been detected by reCAPTCHA."""
+async def recaptcha_detected_bot(tab: Tab, challenge_iframe: WebElement | None = None) -> bool:
+    """Check if the bot has been detected by reCAPTCHA.
+    Args:
+        challenge_iframe (WebElement): Already resolved challenge iframe, queried from the tab if not given.
+    """
     try:
-        challenge_iframe = await tab.query(
-            'iframe[title*="recaptcha challenge"]', raise_exc=False
+        challenge_iframe = challenge_iframe or await tab.query(
+            CHALLENGE_IFRAME_SELECTOR, raise_exc=False
         )
         if not challenge_iframe:
             return False
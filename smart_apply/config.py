@@ -1,9 +1,14 @@
 import yaml
+from functools import cached_property
 from pathlib import Path
 
+# libyaml based loader when available, it is much faster than the pure python one
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 class Config:
     def __init__(self):
         self._config = {}
+        self._flat = {}
         self.root_dir = Path(__file__).parent.parent
         self.config_path = self.root_dir / "config.yaml"
         self._load_config()
@@ -11,73 +16,102 @@ class Config:
     def _load_config(self):
         if self.config_path.exists():
             with open(self.config_path, "r", encoding="utf-8") as f:
-                self._config = yaml.safe_load(f) or {}
+                self._config = yaml.load(f, Loader=_YamlLoader) or {}
+        self._flat = flatten(self._config)
         
     def get(self, key_path: str, default=None):
         """Get a configuration value using a dot-separated path."""
-        keys = key_path.split(".")
-        value = self._config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
-
-    @property
+        return self._flat.get(key_path, default)
+
+    @cached_property
     def langfuse_enabled(self) -> bool:
         return str(self.get("langfuse.enabled", "false")).lower() == "true"
 
-    @property
+    @cached_property
     def langfuse_public_key(self) -> str:
         return self.get("langfuse.public_key", "")
 
-    @property
+    @cached_property
     def langfuse_secret_key(self) -> str:
         return self.get("langfuse.secret_key", "")
 
-    @property
+    @cached_property
     def langfuse_host(self) -> str:
         return self.get("langfuse.host", "https://cloud.langfuse.com")
 
-    @property
+    @cached_property
     def azure_openai_model_fast(self) -> str:
         return self.get("azure_openai.model_fast", "")
 
-    @property
+    @cached_property
     def azure_openai_model_smart(self) -> str:
         return self.get("azure_openai.model_smart", "")
 
-    @property
+    @cached_property
     def azure_openai_endpoint(self) -> str:
         return self.get("azure_openai.endpoint", "")
 
-    @property
+    @cached_property
     def azure_openai_api_key(self) -> str:
         return self.get("azure_openai.api_key", "")
 
-    @property
+    @cached_property
     def azure_openai_api_version(self) -> str:
         return self.get("azure_openai.api_version", "")
 
-    @property
+    @cached_property
+    def llm_concurrency(self) -> int:
+        return int(self.get("llm.concurrency", 8))
+
+    @cached_property
+    def llm_page_text_budget(self) -> int:
+        return int(self.get("llm.page_text_budget", 16384))
+
+    @cached_property
+    def browser_concurrency(self) -> int:
+        return int(self.get("browser.concurrency", 4))
+
+    @cached_property
+    def browser_cdp_endpoint(self) -> str:
+        return self.get("browser.cdp_endpoint", "")
+
+    @cached_property
+    def recaptcha_speech_backend(self) -> str:
+        return self.get("recaptcha.speech_backend", "google")
+
+    @cached_property
+    def recaptcha_whisper_model(self) -> str:
+        return self.get("recaptcha.whisper_model", "tiny.en")
+
+    @cached_property
     def applicant_name(self) -> str:
         return self.get("applicant.name", "")
 
-    @property
+    @cached_property
     def applicant_email(self) -> str:
         return self.get("applicant.email", "")
 
-    @property
+    @cached_property
     def applicant_subject(self) -> str:
         return self.get("applicant.subject", "")
 
-    @property
+    @cached_property
     def applicant_pdf(self) -> str:
         return self.get("applicant.pdf", "")
 
-    @property
+    @cached_property
     def applicant_message(self) -> str:
         return self.get("applicant.message", "")
 
+def flatten(config: dict, prefix: str = "") -> dict:
+    """Map every dot-separated path of the nested config (sections included) to its value."""
+    flat = {}
+    for key, value in config.items():
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+    return flat
+
+
 settings = Config()
\ No newline at end of file
@@ -1,4 +1,5 @@
-import base64, json, os, time
+import asyncio, base64, os, time
+import orjson
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
@@ -25,9 +26,8 @@ def auth():
     
     # Check if token.json exists with stored credentials
     if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_info(
-            json.loads(open(TOKEN_PATH).read())
-        )
+        with open(TOKEN_PATH, 'rb') as f:
+            creds = Credentials.from_authorized_user_info(orjson.loads(f.read()))
     
     # If credentials don't exist or are invalid, get new ones
     if not creds or not creds.valid:
@@ -101,13 +101,26 @@ def create_message(sender, to, subject, body, attachments=None):
     return {'raw': raw}
 
 
+# Transient errors (429, 5xx, 403 rate limits) are retried by googleapiclient with jittered exponential backoff
+SEND_RETRIES = 5
+
 # After Gmail authentication our credentials will be stored here
 creds = None
 service = None
-last_send_time = 0
+last_send_time = float('-inf')
+# Serializes concurrent senders so the throttle below holds across all of them
+send_lock = asyncio.Lock()
+# The quota error that stopped sending, retrying before the quota resets would only fail the same way
+quota_error: HttpError | None = None
+
+
+def gmail_quota_exhausted() -> bool:
+    """Whether sending hit the Gmail quota earlier in this run."""
+    return quota_error is not None
+
 
 # TODO: Refactor not to use global variables e.g. gmail_sender() -> send_email_from_me()
-def send_email_from_me(to, subject, body, attachments=None):
+async def send_email_from_me(to, subject, body, attachments=None):
     """ Send email via Gmail API.\n
     Note:
         Personal Gmail has limit of 500 emails/day.
@@ -115,27 +128,44 @@ def send_email_from_me(to, subject, body, attachments=None):
         So 15000 / 60 / 100 = 2.5 messages per second in theory
         based on https://developers.google.com/workspace/gmail/api/reference/quota
     """
-    global creds, service, last_send_time
+    global last_send_time, quota_error
+
+    async with send_lock:
+        # Senders that queued up behind the one hitting the quota fail right away
+        if quota_error:
+            raise quota_error
+
+        # Throttling: Enforce at least 10 seconds between sends to stay under 6 messages/min (very conservative).
+        # Sleep asynchronously so other browser work can proceed on the event loop meanwhile.
+        time_since_last = time.monotonic() - last_send_time
+        if time_since_last < 10:
+            await asyncio.sleep(10 - time_since_last)
+
+        # Auth, token refresh and googleapiclient are all blocking, run them in a worker thread
+        try:
+            res = await asyncio.to_thread(send_as_me, to, subject, body, attachments)
+        except HttpError as e:
+            if gmail_quota_exceeded(e):
+                quota_error = e
+            raise
+        last_send_time = time.monotonic()
+        return res
+
+
+def send_as_me(to, subject, body, attachments=None):
+    """Blocking part of send_email_from_me(), authenticates if needed and sends the email."""
+    global creds, service
 
-    # Throttling: Enforce at least 10 seconds between sends to stay under 6 messages/min (very conservative)
-    time_since_last  = time.time() - last_send_time
-    if time_since_last < 10:
-        time.sleep(10 - time_since_last)
-    
     # Authenticate and build service if not already fresh/valid
     if not creds or creds.token_state != TokenState.FRESH:
         creds = auth()
         service = build('gmail', 'v1', credentials=creds)
-    
+
     # Special value indicating the authenticated user to avoid emails being flagged with warning 
     sender = "me"
 
     email = create_message(sender, to, subject, body, attachments)
-    
-    res = service.users().messages().send(
-        userId=sender, body=email).execute()
-    last_send_time = time.time()
-    return res
+    return service.users().messages().send(userId=sender, body=email).execute(num_retries=SEND_RETRIES)
 
 
 def gmail_quota_exceeded(e: HttpError) -> bool:
@@ -144,13 +174,14 @@ def gmail_quota_exceeded(e: HttpError) -> bool:
         return True
     if e.resp.status == 403 and e.content:
         try:
-            details = json.loads(e.content.decode('utf-8'))
+            # orjson parses the response bytes as they are, no decode to str first
+            details = orjson.loads(e.content)
             reasons = [
                 err.get('reason', '')
                 for err in details.get('error', {}).get('errors', [])
             ]
             return any(r in ('rateLimitExceeded', 'userRateLimitExceeded', 'dailyLimitExceeded') for r in reasons)
-        except (json.JSONDecodeError, AttributeError):
+        except (orjson.JSONDecodeError, AttributeError):
             pass
     return False
 
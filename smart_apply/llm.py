@@ -1,7 +1,11 @@
-from typing import Literal
-from openai import AzureOpenAI
-#from langfuse import Langfuse, get_client, observe
+import asyncio
+from functools import cache
+from typing import TYPE_CHECKING, Literal
 from smart_apply.config import settings
+from smart_apply.logger import log_warning
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
 
 LANGFUSE_ENABLED = settings.langfuse_enabled
 
@@ -11,48 +15,65 @@ LANGFUSE_ENABLED = settings.langfuse_enabled
 # gpt 5 nano: 0.05/0.4
 
 
-def apply_if(decorator, condition):
-    """Apply decorator only if condition is True"""
-    return decorator if condition else lambda f: f
-
-
 # Available models
 type Model = Literal["fast", "smart"]
 
-#@apply_if(observe, LANGFUSE_ENABLED)
-def ask_llm(message: str, model: Model = "fast") -> str:
+# Limits in-flight requests so concurrent site workers don't outrun the provider's rate limit
+llm_semaphore = asyncio.Semaphore(settings.llm_concurrency)
+
+# Prompt tokens sent and how many of them the provider served from its prompt cache, for the stats panel
+llm_usage = {"prompt_tokens": 0, "cached_tokens": 0}
+
+async def ask_llm(message: str, model: Model = "fast", prompt_cache_key: str = "smart-apply") -> str:
+    """Prompts should start with their static instructions and end with the page data, so calls sharing
+    a prompt_cache_key (one per prompt template) hit the provider's prompt prefix cache."""
     model_id = settings.azure_openai_model_fast if model == "fast" else settings.azure_openai_model_smart
-    response = llm.chat.completions.create(
-        messages=[
-            { "role": "system", "content": "Do not include any reasoning in your response." },
-            { "role": "user", "content": message }
-        ],
-        model=model_id
-    )
+    async with llm_semaphore:
+        response = await llm_client().chat.completions.create(
+            messages=[
+                { "role": "system", "content": "Do not include any reasoning in your response." },
+                { "role": "user", "content": message }
+            ],
+            model=model_id,
+            prompt_cache_key=prompt_cache_key
+        )
+
+    if usage := response.usage:
+        llm_usage["prompt_tokens"] += usage.prompt_tokens
+        if details := usage.prompt_tokens_details:
+            llm_usage["cached_tokens"] += details.cached_tokens or 0
 
     return response.choices[0].message.content
 
-# Configure telemetry to debug model behavior and monitor usage
-# if LANGFUSE_ENABLED:
-#     langfuse = Langfuse(
-#         public_key=settings.langfuse_public_key,
-#         secret_key=settings.langfuse_secret_key,
-#         host=settings.langfuse_host
-#     )
-
-#     langfuse = get_client()
-
-#     # Verify connection
-#     if langfuse.auth_check():
-#         print("Langfuse client is authenticated and ready!")
-#     else:
-#         print("Authentication failed. Please check your credentials and host.")
-
-#     # for langfuse to work with smolagents and azure open ai
-#     SmolagentsInstrumentor().instrument()
-
-llm = AzureOpenAI(
-    azure_endpoint=settings.azure_openai_endpoint,
-    api_key=settings.azure_openai_api_key,
-    api_version=settings.azure_openai_api_version
-)
\ No newline at end of file
+# Traced only when telemetry is on, otherwise ask_llm stays the plain function with no wrapper to call through
+if LANGFUSE_ENABLED:
+    try:
+        from langfuse import Langfuse, observe
+    except ImportError:
+        log_warning("langfuse is not installed, LLM calls are not traced.")
+    else:
+        # Configure telemetry to debug model behavior and monitor usage, the client is the one observe() reports to
+        Langfuse(
+            public_key=settings.langfuse_public_key,
+            secret_key=settings.langfuse_secret_key,
+            host=settings.langfuse_host
+        )
+        ask_llm = observe(ask_llm)
+
+# Transient errors (429, 5xx, connection issues) are retried by the client itself
+# with jittered exponential backoff, honoring Retry-After headers
+LLM_MAX_RETRIES = 5
+
+
+@cache
+def llm_client() -> "AsyncAzureOpenAI":
+    """Async client, so concurrent sites' requests overlap on the wire without tying up threads.
+    Created on the first LLM call, importing openai takes most of a second that modules only parsing pages don't need."""
+    from openai import AsyncAzureOpenAI
+
+    return AsyncAzureOpenAI(
+        azure_endpoint=settings.azure_openai_endpoint,
+        api_key=settings.azure_openai_api_key,
+        api_version=settings.azure_openai_api_version,
+        max_retries=LLM_MAX_RETRIES
+    )
@@ -0,0 +1,54 @@
+import hashlib
+import time
+from pathlib import Path
+
+import orjson
+
+from smart_apply.llm import Model, ask_llm
+
+CACHE_DIR = Path.home() / '.cache' / 'smart-apply'
+CACHE_TTL = 7 * 24 * 3600
+
+
+def cache_key(model: Model, key_inputs: list[str]) -> str:
+    """sha256 of the model and the length-prefixed inputs, so different splits of the same bytes never collide."""
+    h = hashlib.sha256(model.encode())
+    for value in key_inputs:
+        data = value.encode()
+        h.update(len(data).to_bytes(8, 'big'))
+        h.update(data)
+    return h.hexdigest()
+
+
+async def cached_ask_llm(prompt: str, model: Model, key_inputs: list[str]) -> str:
+    """ask_llm for prompts whose JSON answer depends only on key_inputs (the prompt name, its version, then the data).
+    Answers are kept on disk for CACHE_TTL, ones that no longer parse as JSON are evicted and asked again."""
+    path = CACHE_DIR / f'{cache_key(model, key_inputs)}.json'
+
+    try:
+        entry = orjson.loads(path.read_bytes())
+        if entry['expires_at'] > time.time():
+            orjson.loads(entry['response'])
+            return entry['response']
+    except FileNotFoundError:
+        pass
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        path.unlink(missing_ok=True)
+
+    response = await ask_llm(prompt, model, prompt_cache_key=key_inputs[0])
+
+    # Only answers usable by the callers are worth keeping
+    try:
+        orjson.loads(response)
+    except orjson.JSONDecodeError:
+        return response
+
+    now = time.time()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(orjson.dumps({
+        'response': response,
+        'model': model,
+        'created_at': now,
+        'expires_at': now + CACHE_TTL,
+    }))
+    return response
@@ -1,6 +1,9 @@
+import atexit
 import logging
+import queue
 from contextvars import ContextVar
 from datetime import date
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from rich.console import Console
@@ -13,6 +16,18 @@ console = Console(stderr=True)
 
 _current_host: ContextVar[str] = ContextVar('current_host', default='')
 
+# Owns the real (blocking) handlers on a background thread, see setup_logging()
+_listener: QueueListener | None = None
+
+# Names of the message-only loggers writing to their own <name>.log files
+_RECORD_LOGGERS = ('sent_emails', 'failed_forms', 'failed_urls')
+
+# Resolved once, logging.getLogger() takes the module-wide logging lock on every call
+_app_log = logging.getLogger('smart_apply')
+_sent_emails_log = logging.getLogger('smart_apply.sent_emails')
+_failed_forms_log = logging.getLogger('smart_apply.failed_forms')
+_failed_urls_log = logging.getLogger('smart_apply.failed_urls')
+
 
 def set_host(host: str):
     _current_host.set(host)
@@ -22,10 +37,15 @@ def current_host() -> str:
     return _current_host.get()
 
 
-class _HostnameFilter(logging.Filter):
-    def filter(self, record: logging.LogRecord) -> bool:
+class _HostnameQueueHandler(QueueHandler):
+    """Stamps the current hostname on records before they are enqueued.
+    The hostname lives in a ContextVar, so it has to be read on the caller's side of the queue,
+    formatters run on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
         record.hostname = _current_host.get()
-        return True
+        return record
 
 
 class _RichConsoleHandler(logging.Handler):
@@ -47,26 +67,40 @@ class _FileFormatter(logging.Formatter):
     """File formatter that includes hostname only when set."""
 
     def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, 'blank_line', False):
+            return ''
         hostname = getattr(record, 'hostname', '')
         if hostname:
             record.msg = f"{hostname}   {record.msg}"
         return super().format(record)
 
 
+class _BufferedFileHandler(logging.FileHandler):
+    """FileHandler writing through an 8 KB buffer instead of flushing after every record.
+    Whatever is still buffered is written when logging shuts down at exit."""
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=8192, encoding=self.encoding, errors=self.errors)
+
+    def flush(self):
+        pass
+
+
 class RichColoredFormatter(logging.Formatter):
+    _LEVEL_COLORS = {
+        logging.DEBUG: 'bright_magenta',
+        logging.INFO: 'bright_green',
+        logging.WARNING: 'bright_yellow',
+        logging.ERROR: 'bright_red',
+    }
+
     def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, 'blank_line', False):
+            return ''
         record.asctime = self.formatTime(record, self.datefmt)
         hostname = getattr(record, 'hostname', '')
 
-        color = 'white'
-        if record.levelno == logging.INFO:
-            color = 'bright_green'
-        elif record.levelno == logging.WARNING:
-            color = 'bright_yellow'
-        elif record.levelno == logging.ERROR:
-            color = 'bright_red'
-        elif record.levelno == logging.DEBUG:
-            color = 'bright_magenta'
+        color = self._LEVEL_COLORS.get(record.levelno, 'white')
 
         # Mimic the 2 spaces _FileFormatter adds when a hostname is present
         host_part = f"[yellow]{hostname}[/yellow]  " if hostname else ""
@@ -103,73 +137,83 @@ def setup_logging():
     file_fmt = _FileFormatter('%(asctime)s  %(levelname)s  %(message)s', datefmt='%H:%M:%S')
     console_fmt = RichColoredFormatter(datefmt='%H:%M:%S')
 
-    hostname_filter = _HostnameFilter()
+    # Only records of the app logger itself go to console and app.log
+    app_records = lambda record: record.name == 'smart_apply'
 
     # Console handler (routed through Rich Console to avoid ghosting with Live panels)
     console_handler = _RichConsoleHandler(console)
     console_handler.setLevel(logging.DEBUG)
     console_handler.setFormatter(console_fmt)
-    console_handler.addFilter(hostname_filter)
-    app_logger.addHandler(console_handler)
+    console_handler.addFilter(app_records)
 
-    # app.log file handler
-    app_file = logging.FileHandler(log_dir / 'app.log', mode='a', encoding='utf-8')
+    # app.log file handler, buffered as it gets every debug line.
+    # The record logs below keep flushing each line, they must survive the process being killed
+    app_file = _BufferedFileHandler(log_dir / 'app.log', mode='a', encoding='utf-8')
     app_file.setLevel(logging.DEBUG)
     app_file.setFormatter(file_fmt)
-    app_file.addFilter(hostname_filter)
-    app_logger.addHandler(app_file)
+    app_file.addFilter(app_records)
 
     # Specialized loggers (message-only format, no propagation to parent)
     msg_fmt = logging.Formatter('%(message)s')
+    record_handlers = []
+
+    for name in _RECORD_LOGGERS:
+        handler = logging.FileHandler(log_dir / f'{name}.log', mode='a', encoding='utf-8')
+        handler.setFormatter(msg_fmt)
+        handler.addFilter(logging.Filter(f'smart_apply.{name}'))
+        record_handlers.append(handler)
+
+    # Log calls only enqueue records; a single background thread does the actual console/disk writes
+    # so the asyncio event loop never blocks on file I/O
+    log_queue = queue.SimpleQueue()
+    queue_handler = _HostnameQueueHandler(log_queue)
+    app_logger.addHandler(queue_handler)
 
-    for name in ('sent_emails', 'failed_forms', 'failed_urls'):
+    for name in _RECORD_LOGGERS:
         logger = logging.getLogger(f'smart_apply.{name}')
         logger.setLevel(logging.DEBUG)
         logger.propagate = False
+        logger.addHandler(queue_handler)
 
-        if not logger.handlers:
-            handler = logging.FileHandler(log_dir / f'{name}.log', mode='a', encoding='utf-8')
-            handler.setFormatter(msg_fmt)
-            logger.addHandler(handler)
+    global _listener
+    _listener = QueueListener(
+        log_queue, console_handler, app_file, *record_handlers, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
 
 
 # ── Convenience functions ──
 
 def log_blank_line():
-    """Write a blank line to every handler of the app logger (console + file)."""
-    logger = logging.getLogger('smart_apply')
-    for handler in logger.handlers:
-        match handler:
-            case _RichConsoleHandler():
-                handler._console.print()
-            case _ if hasattr(handler, 'stream'):
-                handler.stream.write('\n')
-                handler.stream.flush()
+    """Write a blank line to the app log (console + file).
+    Goes through the log queue like any other record to keep ordering intact."""
+    _app_log.info('', extra={'blank_line': True})
 
 
 def log_info(msg: str):
-    logging.getLogger('smart_apply').info(msg)
+    _app_log.info(msg)
 
 
 def log_warning(msg: str):
-    logging.getLogger('smart_apply').warning(msg)
+    _app_log.warning(msg)
 
 
 def log_error(msg: str):
-    logging.getLogger('smart_apply').error(msg)
+    _app_log.error(msg)
 
 
 def log_debug(msg: str):
-    logging.getLogger('smart_apply').debug(msg)
+    _app_log.debug(msg)
 
 
 def record_sent_email(email: str):
-    logging.getLogger('smart_apply.sent_emails').info(email)
+    _sent_emails_log.info(email)
 
 
 def record_failed_form(url: str):
-    logging.getLogger('smart_apply.failed_forms').info(url)
+    _failed_forms_log.info(url)
 
 
 def record_failed_url(url: str):
-    logging.getLogger('smart_apply.failed_urls').info(url)
\ No newline at end of file
+    _failed_urls_log.info(url)
\ No newline at end of file
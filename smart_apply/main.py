@@ -1,18 +1,22 @@
 import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
-from googleapiclient.errors import HttpError
 
 from pydoll.browser.chromium import Chrome
 from pydoll.browser.options import ChromiumOptions
+from pydoll.browser.tab import Tab
 
-from smart_apply.result import Err, Ok
+from smart_apply.result import Err, Ok, Result
 from smart_apply.apply_methods import (
-    ApplyContext, AppliedViaEmail, AppliedViaForm, 
+    ApplyContext, ApplyStatus, AppliedViaEmail, AppliedViaForm, 
     NoLinksFound, FailedAttempt, NoApplicationMethod,
-    apply_on_site, hostname
+    apply_on_site, ensure_https, hostname
 )
-from smart_apply.gmail import gmail_quota_exceeded
+from smart_apply.browser_utils import close_tab
+from smart_apply.captcha_solvers.recaptcha import close_audio_session
 from smart_apply.config import settings
+from smart_apply.llm import llm_usage
 from smart_apply.logger import (
     record_failed_url,
     setup_logging, 
@@ -33,16 +37,18 @@ from rich.padding import Padding
 PROJECT_ROOT = Path(__file__).parent.parent
 URLS_FILE = PROJECT_ROOT / 'data' / 'urls.txt'
 BROWSER_DATA_DIR = PROJECT_ROOT / '.browser_session_data'
+BROWSER_CACHE_DIR = PROJECT_ROOT / '.browser_cache'
+BROWSER_CACHE_SIZE = 500 * 1024 * 1024
 
 
 async def main():
     setup_logging()
 
-    with open(URLS_FILE, 'r') as f:
-        urls = [line.strip() for line in f if line.strip()]
+    urls = load_urls(URLS_FILE)
+    total_urls = len(urls)
 
-    if urls:
-        log_info(f"Total URLs to process: {len(urls)}")
+    if total_urls:
+        log_info(f"Total URLs to process: {total_urls}")
     else:
         log_info("No URLs found in urls.txt. Exiting.")
         exit(0)
@@ -51,7 +57,7 @@ async def main():
 
     # Counters
     stats = {
-        "total_sites": len(urls),
+        "total_sites": total_urls,
         "processed_sites": 0,
         "sent_emails": 0,
         "submitted_forms": 0
@@ -59,71 +65,156 @@ async def main():
 
     options = ChromiumOptions()
     options.add_argument('--start-maximized')
-
-    # Start the live stats display (wraps all processing)
-    with Live(stats_panel(stats), console=console, auto_refresh=True) as live:
+    # Persistent profile and HTTP cache, so DNS, TLS sessions and cached resources carry over between runs
+    BROWSER_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    options.add_argument(f'--user-data-dir={BROWSER_DATA_DIR}')
+    options.add_argument(f'--disk-cache-dir={BROWSER_CACHE_DIR}')
+    options.add_argument(f'--disk-cache-size={BROWSER_CACHE_SIZE}')
+
+    try:
+        # Start the live stats display (wraps all processing).
+        # No refresh thread re-renders it on a timer, workers redraw it on the event loop when the stats change
+        with Live(stats_panel(stats), console=console, auto_refresh=False) as live:
+            async with browser_session(options) as browser:
+                # Sites are mostly waiting on network, browser and LLM, so several of them are processed concurrently
+                concurrency = max(1, min(settings.browser_concurrency, total_urls))
+
+                queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=concurrency * 2)
+                await asyncio.gather(
+                    url_producer(urls, queue, concurrency),
+                    *(site_worker(browser, queue, stats, live) for _ in range(concurrency))
+                )
+
+                log_info("All websites have been processed.")
+    finally:
+        # Also on errors and Ctrl+C, so the audio session of the reCAPTCHA solver isn't left open
+        await close_audio_session()
+
+
+@asynccontextmanager
+async def browser_session(options: ChromiumOptions) -> AsyncIterator[Chrome]:
+    """Launch Chrome for this run, or attach to an already running one at browser.cdp_endpoint.
+    An attached browser is only disconnected on exit and keeps running for the next run."""
+    if cdp_endpoint := settings.browser_cdp_endpoint:
+        browser = Chrome()
+        log_info(f'Connecting to running browser at {cdp_endpoint}...')
+        await browser.connect(cdp_endpoint)
+        try:
+            yield browser
+        finally:
+            await browser.close()
+    else:
         async with Chrome(options=options) as browser:
             # Start the initial tab (required by PyDoll)
             await browser.start()
-
-            for url in urls:
-                host = hostname(url)
-                set_host(host)
-
-                log_blank_line()
-                log_info(f"Processing website: {host}...")
-                
-                # Create a new tab for each website to ensure a clean state
-                tab = await browser.new_tab()
-
-                ctx = ApplyContext(tab, None)
-                
-                res = await apply_on_site(ctx, url)
-                
-                match res:
-                    case Ok(status):
-                        match status:
-                            case AppliedViaEmail(email):
-                                stats["sent_emails"] += 1
-                            case AppliedViaForm(url):
-                                stats["submitted_forms"] += 1
-                            case NoLinksFound():
-                                log_info(f"No relevant links found on {host}.")
-                            case FailedAttempt():
-                                pass
-                            case NoApplicationMethod():
-                                log_info(f"No email or form application were found on website {host}.")
-                    
-                    case Err(e):
-                        match e:
-                            # TODO: handle the case when site is not available
-                            case HttpError() if gmail_quota_exceeded(e):
-                                log_error(f"Gmail API rate limit reached: {e._get_reason()}")
-                                exit(0)
-                            case _:
-                                log_error(f"Failed to apply on website {host}: {e}")
-
-                        record_failed_url(url)
-            
-                stats["processed_sites"] += 1
-                log_info(f"Finished processing website.")
-                live.update(stats_panel(stats))
-                await tab.close()
-                set_host('')
-
-            log_info("All websites have been processed.")
+            yield browser
+
+
+# A worker's tab is replaced after this many sites to drop renderer memory that piles up over navigations
+TAB_MAX_USES = 50
+# Seconds a tab gets to load about:blank before it is considered broken
+TAB_PARK_TIMEOUT = 10
+
+
+def load_urls(path: Path) -> list[str]:
+    """Non-empty lines of the file without repeated URLs, so a site is never applied to twice."""
+    with open(path, 'r') as f:
+        return list(dict.fromkeys(ensure_https(url) for line in f if (url := line.strip())))
+
+
+async def url_producer(urls: list[str], queue: asyncio.Queue[str | None], workers: int):
+    """Feed the URLs to the queue, then one None per worker to stop them."""
+    for url in urls:
+        await queue.put(url)
+
+    for _ in range(workers):
+        await queue.put(None)
+
+
+async def site_worker(browser: Chrome, queue: asyncio.Queue[str | None], stats: dict[str, int], live: Live):
+    """Apply on sites taken from the queue one by one until a None arrives.
+    Sites are opened in the worker's own tab, navigated in place instead of opening a new tab per site."""
+    tab = None
+    uses = 0
+    while (url := await queue.get()) is not None:
+        host = hostname(url)
+        # Each worker runs in its own task, so the host context doesn't leak between workers
+        set_host(host)
+
+        log_blank_line()
+        log_info(f"Processing website: {host}...")
+        
+        if tab is None:
+            tab = await browser.new_tab()
+            uses = 0
+
+        ctx = ApplyContext(tab, None, browser)
+        
+        res = await apply_on_site(ctx, url)
+        finalize_site(res, url, host, stats, live)
+
+        # Park the tab on a blank page between sites, so the last site's scripts stop running.
+        # A tab that can't even do that is broken and gets replaced, as does a long used one.
+        uses += 1
+        if uses >= TAB_MAX_USES or not await park_tab(tab):
+            await close_tab(tab)
+            tab = None
+
+    if tab is not None:
+        await close_tab(tab)
+
+
+def finalize_site(res: Result[ApplyStatus, Exception], url: str, host: str, stats: dict[str, int], live: Live):
+    """Count the outcome of a site, log it and redraw the stats panel, all synchronously in one go.
+    None of it awaits: stats are plain counters and logs are handed to the log listener thread."""
+    match res:
+        case Ok(status):
+            match status:
+                case AppliedViaEmail(email):
+                    stats["sent_emails"] += 1
+                case AppliedViaForm(form_url):
+                    stats["submitted_forms"] += 1
+                case NoLinksFound():
+                    log_info(f"No relevant links found on {host}.")
+                case FailedAttempt():
+                    pass
+                case NoApplicationMethod():
+                    log_info(f"No email or form application were found on website {host}.")
+        
+        case Err(e):
+            # TODO: handle the case when site is not available
+            log_error(f"Failed to apply on website {host}: {e}")
+            record_failed_url(url)
+
+    stats["processed_sites"] += 1
+    log_info(f"Finished processing website.")
+    live.update(stats_panel(stats), refresh=True)
+    set_host('')
+
+
+async def park_tab(tab: Tab) -> bool:
+    """Navigate the tab to about:blank. Returns False if the tab no longer responds."""
+    try:
+        await tab.go_to('about:blank', timeout=TAB_PARK_TIMEOUT)
+        return True
+    except Exception as e:
+        log_warning(f"Failed to reset tab, replacing it: {e}")
+        return False
 
 
 def stats_panel(stats: dict[str, int]) -> Padding:
     total_sites, processed_sites, sent_emails, submitted_forms = stats.values()
 
     applied = sent_emails + submitted_forms
+    prompt_tokens, cached_tokens = llm_usage.values()
+    cache_hit_rate = cached_tokens / prompt_tokens if prompt_tokens else 0
     return Padding(
         Panel(
             f"Processed: {processed_sites} / {total_sites} websites\n"
             f"Emails Sent: {sent_emails}\n"
             f"Forms Submitted: {submitted_forms}\n"
-            f"Total Applied: {applied}",
+            f"Total Applied: {applied}\n"
+            f"LLM Prompt Cache Hits: {cache_hit_rate:.0%}",
             title="Apply to Jobs Progress",
             border_style="white"
         ),
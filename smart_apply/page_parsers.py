@@ -1,64 +1,142 @@
-import json
-from urllib.parse import urljoin, urlparse
+import orjson
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import unquote, urljoin, urlparse
 import re
+from selectolax.lexbor import LexborHTMLParser
 from pydoll.browser.tab import Tab
 from pydoll.elements.web_element import WebElement
 from smart_apply.llm import ask_llm
 from smart_apply.browser_utils import script_value
+from smart_apply.config import settings
 from smart_apply.logger import log_warning
 
 
-async def infer_company_name(tab: Tab) -> str:
-    meta = await tab.query('meta[property="og:site_name"]', raise_exc=False)
-    meta_site_name = meta.get_attribute("content") if meta else None
+# email_valid() limits and pattern, compiled once at import
+_MAX_EMAIL_LENGTH = 254
+
+# Length limits are part of the pattern: local part up to 64 characters, domain labels up to 63
+_EMAIL_PATTERN = re.compile(
+    r"""
+    ^
+    (?=[^@]{1,64}@)
+    (?P<local>
+        [a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+
+        (?:\.[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+)*
+    )
+    @
+    (?P<domain>
+        (?:
+            [a-zA-Z0-9]
+            (?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?
+            \.
+        )+
+        [a-zA-Z]{2,63}
+    )
+    $
+    """,
+    re.VERBOSE,
+)
+
+
+# plain_text_by_regex() patterns, compiled once at import
+_SCRIPT_PATTERN = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+_STYLE_PATTERN = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_SVG_PATTERN = re.compile(r'<svg[^>]*>.*?</svg>', re.DOTALL | re.IGNORECASE)
+_IMG_PATTERN = re.compile(r'<img[^>]*>', re.IGNORECASE)
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Job/contact keywords from _CONTACT_LINKS_RULES, links without any of them in the path never reach the LLM
+_LINK_KEYWORDS_PATTERN = re.compile(
+    r'career|job|vacanc|opening|position|work-with-us|join|hiring|opportunit|recruit|stelle|offerte|emploi|lavora|karriere'
+    r'|about|company|who-we-are|contact|ueber-uns|über-uns|chi-siamo|a-propos|kontakt|contatti|get-in-touch|reach-us',
+    re.IGNORECASE
+)
+
+class _LRUCache(OrderedDict):
+    """Dict keeping only its maxsize most recently used entries, so the caches below don't grow with the run."""
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# Most entries are only needed while their site is processed, these hold a few sites per worker with plenty to spare
+CACHE_MAX_SITES = 256
+CACHE_MAX_PAGES = 1024
 
-    title = await tab.title
+# Inferred company names by host, to ask the smart model only once per site
+_company_names: _LRUCache = _LRUCache(CACHE_MAX_SITES)
+
+
+async def infer_company_name(tab: Tab) -> str:
     url = await tab.current_url
+    host = urlparse(url).netloc
+    if host in _company_names:
+        return _company_names[host]
+
+    # Title and og:site_name in one round trip, rather than a DOM query, a node describe and a title call
+    result = await tab.execute_script(
+        "const meta = document.querySelector('meta[property=\"og:site_name\"]');"
+        "return [document.title, meta && meta.getAttribute('content')]",
+        return_by_value=True
+    )
+    title, meta_site_name = script_value(result) or ('', None)
 
     task = (
-        f"Context: Title '{title}', OG Site Name '{meta_site_name}', URL '{url}'. "
-        "Task: Infer the official short company name. "
+        "Task: Infer the official short company name from the context below. "
         "Guardrails: "
         "- Output ONLY the name. "
         "- Do not include descriptions, taglines, or legal suffixes like 'Inc.' or 'LLC'. "
         "- Maximum 3 words. "
-        "- If unsure, provide the most likely brand name."
+        "- If unsure, provide the most likely brand name. "
+        f"Context: Title '{title}', OG Site Name '{meta_site_name}', URL '{url}'."
     )
     
-    company_name = ask_llm(task, model="smart")
+    company_name = await ask_llm(task, model="smart", prompt_cache_key="company_name")
     
     # Post-process to enforce guardrails
     if not company_name:
         log_warning(f"LLM returned empty company name for URL: {url}.")
         # Fallback to domain name if LLM fails to provide a name
-        domain = urlparse(url).netloc
-        
         # Take first part of domain and capitalize
-        return domain.split('.')[0].capitalize()
+        return host.split('.')[0].capitalize()
       
     # Split LLM response into words and keep only the first 3
     words = company_name.split()
     shortened = " ".join(words[:3])
 
     # Truncate total character length to prevent massive strings (e.g., max 50 chars)
-    return shortened[:50].strip()
+    _company_names[host] = shortened[:50].strip()
+    return _company_names[host]
 
 
-async def extract_contact_links(tab: Tab) -> list[str]:
-    ''' Extract links related to jobs and contact info pages'''
-    
-    url = await tab.current_url
-    result = await tab.execute_script(
-        "return Array.from(document.querySelectorAll('a')).map(el => el.href)",
-        return_by_value=True
-    )
-    links = script_value(result)
-    if not links: return []
+@dataclass
+class PageSignals:
+    job_pages: list[str]
+    contact_pages: list[str]
+    job_emails: list[str]
+    contact_emails: list[str]
 
-    task = (
-    f"Given the following list of URLs found on the page at {url}:\n\n"
-    f"{json.dumps(links, indent=2)}\n\n"
-    "Your task is to extract career/job and high-level company/contact pages with the rules below.\n"
+
+# LLM extraction results by page URL, so a page listed or linked more than once is extracted once
+_page_signals: _LRUCache = _LRUCache(CACHE_MAX_PAGES)
+_page_emails: _LRUCache = _LRUCache(CACHE_MAX_PAGES)
+
+
+# Prompt rules shared by extract_emails() and extract_page_signals()
+_CONTACT_LINKS_RULES = (
     "IMPORTANT: Completely exclude any homepage or landing page in any language "
     "(e.g. '/', '/en', '/de', '/it-it', '/home', or the bare domain URL itself).\n\n"
 
@@ -96,81 +174,197 @@ async def extract_contact_links(tab: Tab) -> list[str]:
     "   - Prioritize shorter/more direct paths when sorting (e.g. '/careers' > '/en/careers' > '/company/careers').\n"
     "   - Within the same length, put the most obvious/canonical keyword first "
     "     (e.g. a page with 'contact' beats one with only 'get-in-touch').\n\n"
+)
+
+_EMAILS_RULES = (
+    "1. 'job_emails': ONLY addresses specifically intended for submitting resumes or contacting recruiters (e.g., careers@, jobs@, recruitment@, hr@, talent@, join@). "
+    "EXCLUDE administrative HR functions like 'verifications@', 'benefits@', or 'payroll@'.\n"
+    "2. 'contact_emails': General-purpose addresses suitable for sending a job inquiry or introduction. "
+    "Good examples: info@, contact@, hello@, hi@, office@, team@, general@, enquiries@, mail@. "
+    "Use your judgement — include any prefix that a real person would read and that is appropriate for a job-related email.\n"
+    "Do NOT include: support@, help@, customer@, sales@, billing@, noreply@, or other clearly non-human / transactional addresses.\n\n"
+    "STRICT EXCLUSIONS (Do not include these in any category):\n"
+    "- Technical/Automated: support@, help@, webmaster@, noreply@, dev@, admin@\n"
+    "- Functional/Transactional: sales@, marketing@, billing@, privacy@, verifications@, media@, press@, legal@\n\n"
+)
+
 
-    "4. Return STRICTLY valid JSON only (no extra text, no markdown):\n"
+async def extract_page_signals(tab: Tab) -> PageSignals:
+    ''' Extract job/contact page links and emails of the current page in a single LLM call'''
+    url = await tab.current_url
+    if url in _page_signals:
+        return _page_signals[url]
+
+    links = candidate_links(await page_links(tab))
+    html_text = await page_text(tab)
+
+    # A page with no candidate links and no email in its text has nothing for the LLM to find
+    if not links and '@' not in html_text:
+        _page_signals[url] = PageSignals([], [], [], [])
+        return _page_signals[url]
+
+    # Static instructions first and page data last, so the instructions are a cacheable prompt prefix
+    task = (
+    "You are given a list of URLs found on a web page and the text of that page, both below.\n"
+    "Your task is to do both A and B below.\n\n"
+    "A. Extract career/job and high-level company/contact pages from the URLs with the rules below.\n"
+    f"{_CONTACT_LINKS_RULES}"
+    "B. Extract and categorize emails from the text with high precision:\n\n"
+    f"{_EMAILS_RULES}"
+    "Return STRICTLY valid JSON only (no extra text, no markdown):\n"
     "{\n"
     "  \"job_pages\": [\"https://example.com/careers\", ...],\n"
-    "  \"contact_pages\": [\"https://example.com/contact\", ...]\n"
+    "  \"contact_pages\": [\"https://example.com/contact\", ...],\n"
+    "  \"job_emails\": [],\n"
+    "  \"contact_emails\": []\n"
     "}\n"
-    "Use full absolute URLs. Empty array if nothing valid is found."
+    "Use full absolute URLs. Sort emails by relevance. Empty array if nothing valid is found for a key.\n\n"
+    f"URLs found on the page at {url}:\n\n"
+    f"{orjson.dumps(links, option=orjson.OPT_INDENT_2).decode()}\n\n"
+    "Text of that page:\n\n"
+    f"{html_text}"
+    )
+
+    res = await ask_llm(task, "smart", prompt_cache_key="page_signals")
+    try:
+        signals = orjson.loads(res)
+    except orjson.JSONDecodeError:
+        signals = None
+    if not isinstance(signals, dict):
+        log_warning(f"LLM returned invalid page signals: {res[:200]}")
+        return PageSignals([], [], [], [])
+
+    # Normalize links to fully qualified URLs and drop emails hallucinated by LLM
+    _page_signals[url] = PageSignals(
+        job_pages=[urljoin(url, link) for link in signals.get('job_pages', [])],
+        contact_pages=[urljoin(url, link) for link in signals.get('contact_pages', [])],
+        job_emails=[email for email in signals.get('job_emails', []) if email_valid(email)],
+        contact_emails=[email for email in signals.get('contact_emails', []) if email_valid(email)],
+    )
+    return _page_signals[url]
+
+
+def candidate_links(links: list[str]) -> list[str]:
+    ''' Links whose path has a job/contact keyword, the only ones worth asking the LLM about'''
+    return [link for link in links if _LINK_KEYWORDS_PATTERN.search(unquote(urlparse(link).path))]
+
+
+async def page_links(tab: Tab) -> list[str]:
+    result = await tab.execute_script(
+        # Drop empty and duplicate hrefs in the page so fewer bytes cross the CDP socket
+        "return [...new Set(Array.from(document.querySelectorAll('a'), el => el.href))].filter(Boolean)",
+        return_by_value=True
     )
+    return script_value(result) or []
 
-    res = ask_llm(task, "smart")
-    extracted_links = json.loads(res)
-    all_links = extracted_links['job_pages'] + extracted_links['contact_pages']
 
-    # Normalize to fully qualified URLs
-    full_urls = [urljoin(url, link) for link in all_links]
-    return full_urls
+async def body_text(tab: Tab) -> str:
+    ''' Rendered text of the page as is, straight from the browser with no html to parse'''
+    result = await tab.execute_script("return (document.body && document.body.innerText) || ''", return_by_value=True)
+    return script_value(result) or ''
+
+
+async def page_text(tab: Tab) -> str:
+    ''' Rendered text of the page plus mailto: addresses, which may not be in the visible text'''
+    result = await tab.execute_script(
+        "const text = (document.body && document.body.innerText) || '';"
+        "const mailto = Array.from(document.querySelectorAll('a[href^=\"mailto:\" i]'), a => a.href.slice(7).split('?')[0]);"
+        "return [text, ...new Set(mailto)].join('\\n')",
+        return_by_value=True
+    )
+    # Emails mostly sit near the top or in the footer, so long pages lose their middle
+    return clip_middle(script_value(result) or '', settings.llm_page_text_budget)
+
+
+def clip_middle(text: str, budget: int) -> str:
+    ''' Keep the first and last budget/2 characters of text longer than budget'''
+    if len(text) <= budget:
+        return text
+    half = budget // 2
+    return f"{text[:half]} ... {text[-half:]}"
 
 
 async def extract_emails(tab: Tab) -> tuple[list[str], list[str]]:
     ''' Extract emails related to career and generic contacts'''
     url = await tab.current_url
-    content = await tab.page_source
-    html_text = html_to_plain_text(content)
+    if url in _page_emails:
+        return _page_emails[url]
+
+    html_text = await page_text(tab)
 
     task = (
-    f"Given the following text from {url}:\n\n"
-    f"{html_text}\n\n"
-    "Your task is to extract and categorize emails with high precision:\n\n"
-    "1. 'job_emails': ONLY addresses specifically intended for submitting resumes or contacting recruiters (e.g., careers@, jobs@, recruitment@, hr@, talent@, join@). "
-    "EXCLUDE administrative HR functions like 'verifications@', 'benefits@', or 'payroll@'.\n"
-    "2. 'contact_emails': General-purpose addresses suitable for sending a job inquiry or introduction. "
-    "Good examples: info@, contact@, hello@, hi@, office@, team@, general@, enquiries@, mail@. "
-    "Use your judgement — include any prefix that a real person would read and that is appropriate for a job-related email.\n"
-    "Do NOT include: support@, help@, customer@, sales@, billing@, noreply@, or other clearly non-human / transactional addresses.\n\n"
-    "STRICT EXCLUSIONS (Do not include these in any category):\n"
-    "- Technical/Automated: support@, help@, webmaster@, noreply@, dev@, admin@\n"
-    "- Functional/Transactional: sales@, marketing@, billing@, privacy@, verifications@, media@, press@, legal@\n\n"
+    "Your task is to extract and categorize emails from the page text below with high precision:\n\n"
+    f"{_EMAILS_RULES}"
     "3. Return a valid JSON object:\n"
     "{\n"
     "  'job_emails': [],\n"
     "  'contact_emails': []\n"
     "}\n"
-    "Sort by relevance. If no emails match a category, return an empty array."
+    "Sort by relevance. If no emails match a category, return an empty array.\n\n"
+    f"Text from {url}:\n\n"
+    f"{html_text}"
     )
     
-    res = ask_llm(task, model="smart")
-    emails = json.loads(res)
+    res = await ask_llm(task, model="smart", prompt_cache_key="emails")
+    emails = orjson.loads(res)
     
     # filter out invalid emails that don't match a basic email pattern (as a safety check against LLM hallucinations)
     emails['job_emails'] = [email for email in emails['job_emails'] if email_valid(email)]
     emails['contact_emails'] = [email for email in emails['contact_emails'] if email_valid(email)]
 
-    return emails['job_emails'], emails['contact_emails']  
+    _page_emails[url] = emails['job_emails'], emails['contact_emails']
+    return _page_emails[url]
+
+
+# Forms shorter than this are search boxes and the like, longer ones are cut to keep the CDP payload small
+MIN_FORM_HTML_LENGTH = 200
+MAX_FORM_HTML_LENGTH = 32768
 
+# Form html without hidden inputs and whitespace between tags. Hidden inputs hold per visit CSRF tokens and nonces
+# the LLM ignores anyway, dropping them lets the same form produce the same prompt and hit the LLM answer cache
+_FORM_HTML_JS = (
+    "form => { const clone = form.cloneNode(true);"
+    " clone.querySelectorAll('input[type=\"hidden\" i]').forEach(input => input.remove());"
+    " return clone.outerHTML.replace(/>\\s+</g, '><') }"
+)
+
+
+async def extract_forms(tab: Tab) -> list[tuple[str, WebElement]]:
+    ''' Extract all forms on the current page as (html snippet, form element) pairs.
+    Tiny forms get an empty snippet, they are kept so list indexes still match the page forms'''
+    # Handles are taken up front, the form picked by index later is the one whose html was seen even if the page changes
+    forms = await tab.query('form', find_all=True, raise_exc=False) or []
+    if not forms: return []
 
-async def extract_forms(tab: Tab) -> list[str]:
-    ''' Extract all forms on the current page as list of html snippets'''
     result = await tab.execute_script(
-        "return Array.from(document.querySelectorAll('form')).map(el => el.outerHTML)",
+        f"return Array.from(document.querySelectorAll('form'), {_FORM_HTML_JS})"
+        f".map(h => h.length < {MIN_FORM_HTML_LENGTH} ? '' : h.slice(0, {MAX_FORM_HTML_LENGTH}))",
         return_by_value=True
     )
+    html_forms = script_value(result) or []
+
+    # A form was added or removed in between, read each form's html separately
+    if len(html_forms) != len(forms):
+        html_forms = [form_snippet(await stripped_form_html(form)) for form in forms]
+
     # TODO: maybe we should scan iframes containing forms as well?
-    return script_value(result) or []
+    return list(zip(html_forms, forms))
 
 
-async def element_outer_html(element: WebElement) -> str:
-    result = await element.execute_script("return this.outerHTML", return_by_value=True)
+def form_snippet(html: str) -> str:
+    return '' if len(html) < MIN_FORM_HTML_LENGTH else html[:MAX_FORM_HTML_LENGTH]
+
+
+async def stripped_form_html(form: WebElement) -> str:
+    result = await form.execute_script(f"return ({_FORM_HTML_JS})(this)", return_by_value=True)
     return script_value(result) or ''
 
 
 def html_to_plain_text(html):
     """
-    Converts HTML to plain text by removing all tags (replacing them with a space to prevent word concatenation)
-    and excluding content from scripts, styles, images, and vector images (SVGs).
-    This function uses regex for speed and has no external dependencies.
+    Converts HTML to plain text, excluding content from scripts, styles, images, and vector images (SVGs).
+    Text of adjacent elements is joined with a space to prevent word concatenation.
+    Uses selectolax (lexbor, C) to walk the DOM in a single pass, falls back to regex if parsing fails.
     Multiple whitespaces are collapsed into a single space at the end.
     
     Args:
@@ -179,65 +373,40 @@ def html_to_plain_text(html):
     Returns:
     str: The plain text extracted from the HTML.
     """
+    try:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(['script', 'style', 'svg', 'img', 'noscript'])
+        root = tree.body or tree.root
+        return ' '.join(root.text(separator=' ', strip=True).split())
+    except Exception:
+        return plain_text_by_regex(html)
+
+
+def plain_text_by_regex(html):
+    """Regex based html_to_plain_text fallback, no parser involved."""
     # Remove <script> tags and their content, replace with space
-    html = re.sub(r'<script[^>]*>.*?</script>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
+    html = _SCRIPT_PATTERN.sub(' ', html)
     
     # Remove <style> tags and their content, replace with space
-    html = re.sub(r'<style[^>]*>.*?</style>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
+    html = _STYLE_PATTERN.sub(' ', html)
     
     # Remove <svg> tags and their content (vector images), replace with space
-    html = re.sub(r'<svg[^>]*>.*?</svg>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
+    html = _SVG_PATTERN.sub(' ', html)
     
     # Remove <img> tags (images, including those with blob: or data: URIs), replace with space
-    html = re.sub(r'<img[^>]*>', ' ', html, flags=re.IGNORECASE)
+    html = _IMG_PATTERN.sub(' ', html)
     
     # Remove all remaining HTML tags (including comments), replace with space
-    html = re.sub(r'<[^>]*>', ' ', html)
+    html = _TAG_PATTERN.sub(' ', html)
     
     # Normalize whitespace: replace multiple spaces/newlines with single space and strip
-    html = re.sub(r'\s+', ' ', html).strip()
+    html = _WHITESPACE_PATTERN.sub(' ', html).strip()
     
     return html
 
 
 def email_valid(email: str) -> bool:
-
-    _MAX_EMAIL_LENGTH = 254
-    _MAX_LOCAL_LENGTH = 64
-    _MAX_DOMAIN_LABEL_LENGTH = 63
-
-    # Compiled once at module level
-    _EMAIL_PATTERN = re.compile(
-        r"""
-        ^
-        (?P<local>
-            [a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+
-            (?:\.[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+)*
-        )
-        @
-        (?P<domain>
-            (?:
-                [a-zA-Z0-9]
-                (?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?
-                \.
-            )+
-            [a-zA-Z]{2,63}
-        )
-        $
-        """,
-        re.VERBOSE,
-    )
-
     if not email or len(email) > _MAX_EMAIL_LENGTH:
         return False
 
-    match = _EMAIL_PATTERN.fullmatch(email)
-    if not match:
-        return False
-
-    local = match.group("local")
-    if len(local) > _MAX_LOCAL_LENGTH:
-        return False
-
-    domain = match.group("domain")
-    return all(len(label) <= _MAX_DOMAIN_LABEL_LENGTH for label in domain.split("."))
\ No newline at end of file
+    return _EMAIL_PATTERN.fullmatch(email) is not None
\ No newline at end of file
@@ -1,6 +1,7 @@
+import asyncio
 from functools import wraps
-import inspect
-from typing import Callable, ParamSpec, TypeVar, Generic, Iterator, overload, Coroutine, Any
+from types import CoroutineType
+from typing import Callable, ParamSpec, TypeVar, Generic, overload, Coroutine, Any
 
 P = ParamSpec('P')  # For preserving args/kwargs types
 T = TypeVar('T')
@@ -12,32 +13,29 @@ class Result(Generic[T, E]):
 
     __slots__ = ()
 
+    # Plain attributes (slots or class constants) on Ok/Err, no property dispatch on access
+    ok: T | None
+    err: E | None
+
     def __bool__(self) -> bool:
         raise NotImplementedError
 
     def __call__(self) -> T | E:
         raise NotImplementedError
 
-    @property
-    def ok(self) -> T | None:
-        raise NotImplementedError
-
-    @property
-    def err(self) -> E | None:
-        raise NotImplementedError
-
-    def __iter__(self) -> Iterator[T | E | None]:
-        # yield two values for flexible unpacking
-        yield self.ok
-        yield self.err
+    def unpack(self) -> tuple[T | None, E | None]:
+        """(ok, err) pair, built directly instead of iterating a generator"""
+        return self.ok, self.err
 
 
 class Ok(Result[T, E]):
-    __slots__ = ("value",)
+    __slots__ = ("value", "ok")
     __match_args__ = ("value",)  # support match statement
 
+    err = None
+
     def __init__(self, value: T):
-        self.value = value
+        self.value = self.ok = value
 
     def __bool__(self) -> bool:
         return True
@@ -45,24 +43,18 @@ class Ok(Result[T, E]):
     def __call__(self) -> T:
         return self.value
 
-    @property
-    def ok(self) -> T:
-        return self.value
-
-    @property
-    def err(self) -> None:
-        return None
-
     def __repr__(self) -> str:
         return f"Ok({self.value!r})"
 
 
 class Err(Result[T, E]):
-    __slots__ = ("error",)
+    __slots__ = ("error", "err")
     __match_args__ = ("error",)  # support match statement
 
+    ok = None
+
     def __init__(self, error: E):
-        self.error = error
+        self.error = self.err = error
 
     def __bool__(self) -> bool:
         return False
@@ -70,14 +62,6 @@ class Err(Result[T, E]):
     def __call__(self) -> E:
         return self.error
 
-    @property
-    def ok(self) -> None:
-        return None
-
-    @property
-    def err(self) -> E:
-        return self.error
-
     def __repr__(self) -> str:
         return f"Err({self.error!r})"
 
@@ -86,6 +70,9 @@ class Err(Result[T, E]):
 # safe_call
 # ==========================================
 
+# The only awaitables wrapped functions return in this codebase, a plain isinstance check with no ABC lookup
+_AWAITABLE_TYPES = (CoroutineType, asyncio.Future)
+
 @overload
 def safe_call(fn: Callable[P, Coroutine[Any, Any, Result[T, E]]], *args: P.args, **kwargs: P.kwargs) -> Coroutine[Any, Any, Result[T, E]]: ...
 
@@ -108,7 +95,7 @@ async def safe_call(fn, *args, **kwargs):
         res = fn(*args, **kwargs)
 
         # 2. If the result is a coroutine, await it
-        if inspect.isawaitable(res):
+        if isinstance(res, _AWAITABLE_TYPES):
             res = await res
             
         # 3. Wrap in Result object if not already wrapped
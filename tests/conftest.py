@@ -4,7 +4,7 @@ from pydoll.browser.options import ChromiumOptions
 import pytest_asyncio
 
 
-@pytest_asyncio.fixture(loop_scope="session")
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def browser():
     """Start Chrome once per session"""
     options = ChromiumOptions()
@@ -0,0 +1,67 @@
+import httplib2
+from googleapiclient.errors import HttpError
+
+import smart_apply.apply_methods as apply_methods
+import smart_apply.gmail as gmail
+from smart_apply.apply_methods import Applicant, ApplyContext, NoApplicationMethod, apply_on_site, apply_via_email
+from smart_apply.config import settings
+from smart_apply.page_parsers import PageSignals
+
+
+class FakeTab:
+    async def enable_auto_solve_cloudflare_captcha(self): pass
+    async def disable_auto_solve_cloudflare_captcha(self): pass
+    async def go_to(self, url, timeout=None): pass
+    async def close(self): pass
+
+
+class FakeBrowser:
+    async def new_tab(self):
+        return FakeTab()
+
+
+async def test_link_pages_get_personalized_message(monkeypatch):
+    explored = []
+
+    async def fake_explore_page(ctx, url):
+        explored.append((ctx.applicant.message, ctx.template.message))
+        return apply_methods.PageLeads(ctx, url, [], [], None)
+
+    async def fake_apply_on_page(page):
+        return NoApplicationMethod()
+
+    async def no_wait(tab): pass
+    async def available(tab): return True
+    async def company_name(tab): return "Acme"
+    async def signals(tab):
+        return PageSignals(["https://acme.com/careers"], ["https://acme.com/contact"], [], [])
+
+    monkeypatch.setattr(settings, "applicant_message", "Hello {company_name} team")
+    monkeypatch.setattr(apply_methods, "site_available", available)
+    monkeypatch.setattr(apply_methods, "wait_until_cloudflare_resolved", no_wait)
+    monkeypatch.setattr(apply_methods, "extract_page_signals", signals)
+    monkeypatch.setattr(apply_methods, "infer_company_name", company_name)
+    monkeypatch.setattr(apply_methods, "explore_page", fake_explore_page)
+    monkeypatch.setattr(apply_methods, "apply_on_page", fake_apply_on_page)
+
+    res = await apply_on_site(ApplyContext(FakeTab(), None, FakeBrowser()), "acme.com")
+
+    assert res.ok == NoApplicationMethod()
+    # Forms are mapped from the template, so LLM answers are cached across sites
+    assert explored == [("Hello Acme team", "Hello {company_name} team")] * 2
+
+
+async def test_no_emails_after_gmail_quota_error(monkeypatch):
+    sent = []
+
+    def quota_exceeded(to, subject, body, attachments=None):
+        sent.append(to)
+        raise HttpError(httplib2.Response({"status": 429}), b"")
+
+    monkeypatch.setattr(gmail, "send_as_me", quota_exceeded)
+    monkeypatch.setattr(gmail, "quota_error", None)
+    ctx = ApplyContext(FakeTab(), Applicant("John Doe", "john@doe.com", "Job", "cv.pdf", "Hello"), FakeBrowser())
+
+    assert not await apply_via_email(ctx, "jobs@acme.com")
+    assert not await apply_via_email(ctx, "jobs@globex.com")
+    assert sent == ["jobs@acme.com"]
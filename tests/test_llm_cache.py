@@ -0,0 +1,32 @@
+import smart_apply.llm_cache as llm_cache
+from smart_apply.llm_cache import cache_key, cached_ask_llm
+
+
+def test_cache_key_length_prefixed():
+    assert cache_key("smart", ["ab", "c"]) != cache_key("smart", ["a", "bc"])
+    assert cache_key("smart", ["a"]) != cache_key("fast", ["a"])
+
+
+async def test_cached_ask_llm(tmp_path, monkeypatch):
+    calls = []
+
+    async def fake_ask_llm(prompt, model, prompt_cache_key):
+        calls.append(prompt)
+        return '{"name": "John"}' if prompt == "valid" else "not json"
+
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(llm_cache, "ask_llm", fake_ask_llm)
+
+    assert await cached_ask_llm("valid", "smart", ["form"]) == '{"name": "John"}'
+    assert await cached_ask_llm("valid", "smart", ["form"]) == '{"name": "John"}'
+    assert len(calls) == 1
+
+    # Non JSON answers are never cached
+    await cached_ask_llm("invalid", "smart", ["other form"])
+    await cached_ask_llm("invalid", "smart", ["other form"])
+    assert len(calls) == 3
+
+    # Corrupted entries are evicted and asked again
+    next(tmp_path.iterdir()).write_bytes(b"garbage")
+    assert await cached_ask_llm("valid", "smart", ["form"]) == '{"name": "John"}'
+    assert len(calls) == 4
@@ -1,8 +1,11 @@
+import asyncio
+
 import pytest
-from smart_apply.page_parsers import html_to_plain_text, infer_company_name, email_valid
-from pydoll.browser.tab import Tab
+from smart_apply import page_parsers
+from smart_apply.page_parsers import html_to_plain_text, plain_text_by_regex, infer_company_name, email_valid, candidate_links, clip_middle
 
-def test_html_to_plain_text():
+@pytest.mark.parametrize("to_plain_text", [html_to_plain_text, plain_text_by_regex])
+def test_html_to_plain_text(to_plain_text):
     html =  """
         <html>
         <head>
@@ -21,27 +24,33 @@ def test_html_to_plain_text():
         </body>
         </html>
     """
-    assert html_to_plain_text(html) == "Hello world! This is bold and italic text. More text here. With a line break."
+    assert to_plain_text(html) == "Hello world! This is bold and italic text. More text here. With a line break."
 
 
-@pytest.mark.parametrize(
-    "url, expected_company_name",
-    [
-        ("https://www.google.com", "Google"),
-        ("https://www.apple.com", "Apple"),
-        ("https://www.microsoft.com", "Microsoft"),
-        ("https://www.neweratech.com", "New Era Technology"),
-        ("https://www.epam.com", "EPAM"),
-        ("https://agilitymultichannel.com", "Insight Software"),
-        ("https://www.qbankdam.com", "QBank"),
-        ("https://www.4ng.nl/", "Conclusion Experience"),
-    ]
-)
-async def test_infer_company_name(tab: Tab, url, expected_company_name):
-    await tab.go_to(url)
-    company_name = await infer_company_name(tab)
-    assert company_name == expected_company_name
-    await tab.close()
+COMPANY_NAMES = {
+    "https://www.google.com": "Google",
+    "https://www.apple.com": "Apple",
+    "https://www.microsoft.com": "Microsoft",
+    "https://www.neweratech.com": "New Era Technology",
+    "https://www.epam.com": "EPAM",
+    "https://agilitymultichannel.com": "Insight Software",
+    "https://www.qbankdam.com": "QBank",
+    "https://www.4ng.nl/": "Conclusion Experience",
+}
+
+
+async def test_infer_company_name(browser):
+    # Each site in its own tab at the same time, so the page loads and LLM calls overlap
+    async def company_name(url: str) -> str:
+        tab = await browser.new_tab()
+        try:
+            await tab.go_to(url)
+            return await infer_company_name(tab)
+        finally:
+            await tab.close()
+
+    names = await asyncio.gather(*(company_name(url) for url in COMPANY_NAMES))
+    assert dict(zip(COMPANY_NAMES, names)) == COMPANY_NAMES
 
 
 @pytest.mark.parametrize(
@@ -63,3 +72,42 @@ async def test_infer_company_name(tab: Tab, url, expected_company_name):
 )
 def test_email_validation(email: str, expected: bool) -> None:
     assert email_valid(email) is expected
+
+
+def test_candidate_links():
+    links = [
+        "https://example.com/",
+        "https://example.com/en/careers",
+        "https://example.com/blog/how-we-build-things",
+        "https://example.com/de/%C3%BCber-uns",
+        "https://example.com/it/contatti",
+        "https://careers.example.com/",
+        "https://example.com/privacy?ref=contact",
+    ]
+    assert candidate_links(links) == [
+        "https://example.com/en/careers",
+        "https://example.com/de/%C3%BCber-uns",
+        "https://example.com/it/contatti",
+    ]
+
+
+def test_clip_middle():
+    assert clip_middle("short text", 16) == "short text"
+    assert clip_middle("header" + "x" * 100 + "footer", 12) == "header ... footer"
+
+
+async def test_page_signals_skip_llm_on_dead_end_page(monkeypatch):
+    class FakeTab:
+        @property
+        def current_url(self):
+            return asyncio.sleep(0, "https://example.com/dead-end")
+
+    async def no_links(tab): return ["https://example.com/blog"]
+    async def text(tab): return "Nothing to see here"
+    async def ask_llm(*args, **kwargs): raise AssertionError("LLM must not be called")
+
+    monkeypatch.setattr(page_parsers, "page_links", no_links)
+    monkeypatch.setattr(page_parsers, "page_text", text)
+    monkeypatch.setattr(page_parsers, "ask_llm", ask_llm)
+
+    assert await page_parsers.extract_page_signals(FakeTab()) == page_parsers.PageSignals([], [], [], [])
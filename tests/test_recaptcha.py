@@ -1,14 +1,32 @@
 import pytest
+import pytest_asyncio
 from smart_apply.captcha_solvers.recaptcha import *
 from pydoll.elements.web_element import WebElement
 from pydoll.browser.tab import Tab
 
 
-NO_RECAPTCHA_URL = 'https://example.com'
+# Inline page, no network round trip needed to check the negative case
+NO_RECAPTCHA_URL = 'data:text/html,<html><body><form><input name="email"></form></body></html>'
 RECAPTCHA_V2_URL = 'https://2captcha.com/demo/recaptcha-v2'
 RECAPTCHA_V2_INVISIBLE_URL = 'https://2captcha.com/demo/recaptcha-v2-invisible'
 RECAPTCHA_V3_URL = 'https://2captcha.com/demo/recaptcha-v3'
 
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def loaded_tab(browser):
+    """Tabs already navigated to a URL, each page is loaded once and shared by the read-only detection tests"""
+    tabs: dict[str, Tab] = {}
+
+    async def tab_for(url: str) -> Tab:
+        if url not in tabs:
+            tabs[url] = await browser.new_tab()
+            await tabs[url].go_to(url)
+        return tabs[url]
+
+    yield tab_for
+    for tab in tabs.values():
+        await tab.close()
+
+
 @pytest.mark.parametrize(
     "url, expected",
     [
@@ -18,11 +36,10 @@ RECAPTCHA_V3_URL = 'https://2captcha.com/demo/recaptcha-v3'
         (RECAPTCHA_V3_URL, True),
     ]
 )
-async def test_page_has_recaptcha(tab, url, expected):
-    await tab.go_to(url)
+async def test_page_has_recaptcha(loaded_tab, url, expected):
+    tab = await loaded_tab(url)
     detected = await page_has_recaptcha(tab)
     assert detected is expected
-    await tab.close()
 
 
 @pytest.mark.parametrize(
@@ -33,13 +50,12 @@ async def test_page_has_recaptcha(tab, url, expected):
         (RECAPTCHA_V3_URL, False),
     ]
 )
-async def test_find_recaptcha_with_checkbox(tab, url, checkbox_visible):
-    await tab.go_to(url)
+async def test_find_recaptcha_with_checkbox(loaded_tab, url, checkbox_visible):
+    tab = await loaded_tab(url)
     container = await tab.query('.g-recaptcha', raise_exc=False)
-    recaptcha = await recaptcha_within_container(container) if container else None
+    recaptcha = await find_recaptcha(container) if container else None
     assert bool(recaptcha) is checkbox_visible
-    await tab.close()
-    
+
 
 @pytest.mark.parametrize(
     "url",
@@ -55,6 +71,4 @@ async def test_solve_recaptcha_if_present(tab: Tab, url: str):
     res = await solve_recaptcha_if_present(form, tab)
     assert res.ok == 'solved'
     solved_result = await recaptcha_solved(tab)
-    assert solved_result
-    
-    await tab.close()
\ No newline at end of file
+    assert solved_result
\ No newline at end of file